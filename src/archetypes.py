@@ -0,0 +1,41 @@
+# archetypes.py
+import json
+import os
+from settings import ENEMY_ARCHETYPE_FILE, ENEMY_DETECTION_RANGE
+
+DEFAULT_ARCHETYPE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", ENEMY_ARCHETYPE_FILE)
+ALL_HOURS = (1 << 24) - 1
+
+def get_hour_mask(hours):
+    # [start, end) in hours, wrapping past midnight, as one bit per hour; None for every hour
+    if hours is None:
+        return ALL_HOURS
+    start_hour, end_hour = hours
+    mask = 0
+    hour = start_hour
+    while hour != end_hour:
+        mask |= 1 << hour
+        hour = (hour + 1) % 24
+    return mask
+
+class EnemyArchetype:
+    # Stats shared by every enemy of one type
+    __slots__ = ("id", "name", "max_health", "speed", "damage", "detection_range", "color", "active_hours", "raid_hours")
+
+    def __init__(self, id, name, data):
+        self.id = id
+        self.name = name
+        self.max_health = data["max_health"]
+        self.speed = data["speed"]
+        self.damage = data["damage"]
+        self.detection_range = data.get("detection_range", ENEMY_DETECTION_RANGE)
+        self.color = tuple(data["color"])
+        self.active_hours = get_hour_mask(data.get("active_hours"))  # On the map only during these hours
+        self.raid_hours = get_hour_mask(data.get("raid_hours", [0, 0]))  # Hours spent heading to and patrolling the village
+
+def load_archetypes(path):
+    with open(path) as file:
+        data = json.load(file)
+    return {name: EnemyArchetype(id, name, stats) for id, (name, stats) in enumerate(data.items())}
+
+enemy_archetypes = load_archetypes(DEFAULT_ARCHETYPE_PATH)
@@ -0,0 +1,36 @@
+# bake_map.py
+# Offline baker: writes the procedural world to the binary map file memory-mapped by map.py
+# Usage: python src/bake_map.py [--output PATH] [--seed N] [--width TILES] [--height TILES] [--chunk-size TILES] [--workers N]
+import argparse
+import math
+import os
+import time
+from settings import MAP_TILES_X, MAP_TILES_Y, CHUNK_SIZE, WORLD_SEED
+from worldgen import ChunkGenerator
+from map_file import write_map_file, DEFAULT_MAP_PATH
+
+def bake(path, seed, width, height, chunk_size, workers):
+    chunks_x = math.ceil(width / chunk_size)
+    chunks_y = math.ceil(height / chunk_size)
+    generator = ChunkGenerator(seed, workers, chunk_size, width, height)
+    chunk_keys = [(chunk_x, chunk_y) for chunk_y in range(chunks_y) for chunk_x in range(chunks_x)]
+    try:
+        write_map_file(path, seed, width, height, chunk_size, generator.map(chunk_keys))
+    finally:
+        generator.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bake the procedural world into a binary map file.")
+    parser.add_argument("--output", default=DEFAULT_MAP_PATH)
+    parser.add_argument("--seed", type=int, default=WORLD_SEED)
+    parser.add_argument("--width", type=int, default=MAP_TILES_X)
+    parser.add_argument("--height", type=int, default=MAP_TILES_Y)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="0 generates on this process")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    bake(args.output, args.seed, args.width, args.height, args.chunk_size, args.workers)
+    print(f"Baked {args.width}x{args.height} map to {args.output} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# bench_pathfinding.py
+# Compares the A* and Jump Point Search strategies of PathEngine on generated maps.
+# worldgen only places features (mountains, river, villages) within its first 100x100 tiles,
+# so larger maps repeat that region to keep the same obstacle density at every size
+# Usage: python src/bench_pathfinding.py [--sizes 100 300 ...] [--queries N] [--seed N]
+import argparse
+import random
+import time
+import numpy as np
+from settings import MAP_TILES_X, WORLD_SEED
+from map import collidable_tiles
+from worldgen import generate_region
+from pathfinding import PathEngine
+
+FEATURE_REGION = 100  # Tiles per side of the region worldgen places features in
+
+def generate_map(seed, size):
+    repeats = -(-size // FEATURE_REGION)
+    return np.tile(generate_region(seed, 0, 0, FEATURE_REGION, FEATURE_REGION), (repeats, repeats))[:size, :size]
+
+def bench(size, queries, seed):
+    tiles = generate_map(seed, size)
+    engine = PathEngine(size, size, lambda start_x, start_y, end_x, end_y: tiles[start_y:end_y, start_x:end_x])
+    grid = engine.get_window(0, 0, size, size, collidable_tiles)
+    walkable = [node for node in range(grid.size) if grid.cells[node]]
+    rng = random.Random(seed)
+    pairs = [(rng.choice(walkable), rng.choice(walkable)) for _ in range(queries)]
+    results = {}
+    for strategy in ("astar", "jps"):
+        search = engine.get_search(strategy)
+        start_time = time.perf_counter()
+        results[strategy] = [search(grid, start, goal) for start, goal in pairs]
+        results[strategy + "_time"] = time.perf_counter() - start_time
+    mismatches = sum(len(a) != len(b) for a, b in zip(results["astar"], results["jps"]))
+    blocked = 1 - len(walkable) / grid.size
+    print(f"{size}x{size} ({blocked:.0%} blocked): astar {results['astar_time'] * 1000 / queries:.2f}ms/query, "
+          f"jps {results['jps_time'] * 1000 / queries:.2f}ms/query, "
+          f"speedup {results['astar_time'] / results['jps_time']:.2f}x, length mismatches {mismatches}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark A* against Jump Point Search on generated maps.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[MAP_TILES_X, 300, 1000])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=WORLD_SEED)
+    args = parser.parse_args()
+    for size in args.sizes:
+        bench(size, args.queries, args.seed)
+
+if __name__ == "__main__":
+    main()
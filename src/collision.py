@@ -0,0 +1,56 @@
+# collision.py
+import numpy as np
+from settings import TILE_SIZE
+
+# Boxes are given by their centers and half sizes and cover the whole pixels center ± half size.
+# walkable is a [y, x] window of the tile grid whose first tile is origin, nonzero where walkable;
+# tiles outside it are not solid (callers clamp to the map bounds themselves)
+
+def get_solid(walkable, tile_x, tile_y, origin=(0, 0)):
+    height, width = walkable.shape
+    if not walkable.size:
+        return np.zeros(np.shape(tile_x), dtype=bool)
+    tile_x = tile_x - origin[0]
+    tile_y = tile_y - origin[1]
+    inside = (tile_x >= 0) & (tile_x < width) & (tile_y >= 0) & (tile_y < height)
+    return inside & (walkable[np.clip(tile_y, 0, height - 1), np.clip(tile_x, 0, width - 1)] == 0)
+
+def sweep(walkable, position, cross, half_size, cross_half, delta, horizontal, origin=(0, 0)):
+    # Moves boxes along one axis, stopping each one against the first solid tile its leading edge
+    # sweeps through, so nothing tunnels however long the step. Returns (positions, stopped)
+    direction = np.sign(delta).astype(np.int64)
+    target = position + delta
+    lead_tile = (np.round(position).astype(np.int64) + direction * half_size) // TILE_SIZE
+    end_tile = (np.round(target).astype(np.int64) + direction * half_size) // TILE_SIZE
+    # The tile the edge is already in is never tested, so boxes overlapping a solid tile can leave it
+    steps = (end_tile - lead_tile) * direction
+    cross = np.round(cross).astype(np.int64)
+    cross_first = (cross - cross_half) // TILE_SIZE
+    cross_last = (cross + cross_half) // TILE_SIZE
+    cross_span = int((cross_last - cross_first).max(initial=0)) + 1
+    hit = np.zeros(len(position), dtype=bool)
+    hit_tile = np.zeros(len(position), dtype=np.int64)
+    for step in range(1, int(steps.max(initial=0)) + 1):
+        line = lead_tile + step * direction
+        blocked = np.zeros(len(position), dtype=bool)
+        for offset in range(cross_span):
+            cross_tile = cross_first + offset
+            tile_x, tile_y = (line, cross_tile) if horizontal else (cross_tile, line)
+            blocked |= (cross_tile <= cross_last) & get_solid(walkable, tile_x, tile_y, origin)
+        first_hit = blocked & (step <= steps) & ~hit
+        hit |= first_hit
+        hit_tile[first_hit] = line[first_hit]
+    # Stopped boxes rest with their edge on the last pixel before the tile
+    stop = np.where(direction > 0, hit_tile * TILE_SIZE - 1 - half_size, (hit_tile + 1) * TILE_SIZE + half_size)
+    return np.where(hit, stop, target), hit
+
+def move_boxes(walkable, x, y, half_width, half_height, dx, dy, origin=(0, 0)):
+    # Swept AABB against the tile grid, one axis at a time so boxes slide along walls
+    x, blocked_x = sweep(walkable, x, y, half_width, half_height, dx, True, origin)
+    y, blocked_y = sweep(walkable, y, x, half_height, half_width, dy, False, origin)
+    return x, y, blocked_x, blocked_y
+
+def move_box(walkable, x, y, half_width, half_height, dx, dy, origin=(0, 0)):
+    new_x, new_y, blocked_x, blocked_y = move_boxes(walkable, np.array([x], dtype=np.float64), np.array([y], dtype=np.float64),
+                                                   half_width, half_height, np.array([dx], dtype=np.float64), np.array([dy], dtype=np.float64), origin)
+    return new_x.item(), new_y.item()
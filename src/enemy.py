@@ -2,223 +2,180 @@
 import pygame
 import random
 import math
+import numpy as np
 from settings import TILE_SIZE, MAP_WIDTH, MAP_HEIGHT
-from map import get_tile_at_position, find_nearest_bridge, find_path_to_tile
+from archetypes import enemy_archetypes
+from lod import FAR
+from collision import move_boxes
+from map import (get_tile, find_nearest_bridge, needs_crossing, water_tiles, request_path, cancel_path, is_path_pending,
+                 get_delivered_requesters, get_collision_region, subscribe_tile_changes)
+
+ENEMY_STATES = ["Patrol", "Chase", "Return", "ToVillage", "VillagePatrol"]
+PATROL, CHASE, RETURN, TO_VILLAGE, VILLAGE_PATROL = range(len(ENEMY_STATES))
+ENEMY_SIZE = TILE_SIZE - 4
+
+def batch_field(name):
+    # Property reading and writing this enemy's slot of a batch array
+    def get(self):
+        return getattr(self.batch, name)[self.index].item()
+
+    def set(self, value):
+        getattr(self.batch, name)[self.index] = value
+    return property(get, set)
 
 class Enemy:
-    def __init__(self, x, y, name, village_position, time_system, enemy_type="Goblin"):
-        self.image = pygame.Surface((TILE_SIZE-4, TILE_SIZE-4))
-        self.image.fill((255, 0, 0))
-        self.rect = self.image.get_rect(center=(x, y))
-        self.name = name
-        self.time_system = time_system
-        self.enemy_type = enemy_type
-        self.max_health = 30 if enemy_type == "Wolf" else 50
-        self.health = self.max_health
-        self.alive = True
-        self.speed = 200 if enemy_type == "Wolf" else 150
-        self.spawn_hour = 21 if enemy_type == "Wolf" else None
-        self.despawn_hour = 6 if enemy_type == "Wolf" else None
-        self.visible = enemy_type != "Wolf"
-        self.detection_range = 200
-        self.base_position = pygame.math.Vector2(x, y)
-        self.village_position = pygame.math.Vector2(village_position)
-        self.patrol_radius = 96
-        self.patrol_angle = random.uniform(0, 2 * 3.14159)
-        self.patrol_speed = 0.5
-        self.state = "Patrol"
-        self.state_timer = 0
-        self.chase_duration = 3.0
-        self.damage = 5
-        self.attack_cooldown = 0
-        self.attack_cooldown_duration = 1.0
+    # View of one enemy in an EnemyBatch; per-enemy data the batch does not simulate lives here,
+    # per-type data in its archetype
+    __slots__ = ("batch", "index", "image", "name", "time_system", "archetype", "path", "crossing")
+    patrol_radius = 96
+    patrol_speed = 0.5
+    chase_duration = 3.0
+    attack_cooldown_duration = 1.0
+    health = batch_field("health")
+    max_health = batch_field("max_health")
+    alive = batch_field("alive")
+    visible = batch_field("visible")
+    speed = batch_field("speed")
+    detection_range = batch_field("detection_range")
+    damage = batch_field("damage")
+    patrol_angle = batch_field("patrol_angle")
+    state_timer = batch_field("state_timer")
+    attack_cooldown = batch_field("attack_cooldown")
+
+    def __init__(self, batch):
+        # Views start pooled (index -1) until the batch hands them out in spawn
+        self.batch = batch
+        self.index = -1
+        self.image = None
+        self.name = None
+        self.time_system = None
+        self.archetype = None
         self.path = []
-    
-    def update(self, dt, player, map_collidables, time_system):
-        if self.enemy_type == "Wolf":
-            if time_system.hour == 6 and self.visible:
-                self.visible = False
-                self.state = "Patrol"
-                self.path = []
-                self.patrol_angle = random.uniform(0, 2 * 3.14159)
-                print(f"{self.name} despawned at 6:00")
-            else:
-                self.visible = time_system.hour in [21, 22, 23, 0, 1, 2, 3, 4, 5]
-        if not self.alive or not self.visible:
-            return
-        
-        # Update timers
-        self.state_timer -= dt
-        self.attack_cooldown -= dt
-        
-        # Calculate distance to player
-        player_distance = ((self.rect.centerx - player.rect.centerx) ** 2 + (self.rect.centery - player.rect.centery) ** 2) ** 0.5
-        
-        # State transitions
-        if player_distance < self.detection_range and self.state != "Chase":
-            self.state = "Chase"
-            self.state_timer = self.chase_duration
-            self.path = []
-        elif self.state == "Chase" and player_distance >= self.detection_range and self.state_timer <= 0:
-            self.state = "Return"
-            self.path = []
-        elif self.state == "Patrol" and time_system.hour in [21, 22, 23, 0, 1, 2, 3, 4, 5]:
-            self.state = "ToVillage"
-            self.path = []
-        elif self.state == "ToVillage":
-            village_distance = (pygame.math.Vector2(self.rect.center) - self.village_position).length()
-            if village_distance < 10:
-                self.state = "VillagePatrol"
-                self.patrol_angle = random.uniform(0, 2 * 3.14159)
-                self.path = []
-        elif self.state == "VillagePatrol" and time_system.hour not in [21, 22, 23, 0, 1, 2, 3, 4, 5]:
-            self.state = "Return"
-            self.path = []
-        elif self.state == "Return":
-            return_distance = (pygame.math.Vector2(self.rect.center) - self.base_position).length()
-            if return_distance < 10:
-                self.state = "Patrol"
-                self.patrol_angle = random.uniform(0, 2 * 3.14159)
-                self.path = []
-                
-        # Movement logic
-        direction = pygame.math.Vector2(0, 0)
-        speed = self.speed
-        if self.state == "Chase":
-            self_tile_x, self_tile_y = self.rect.centerx // TILE_SIZE, self.rect.centery // TILE_SIZE
-            player_tile_x, player_tile_y = player.rect.centerx // TILE_SIZE, player.rect.centery // TILE_SIZE
-            self_on_river = get_tile_at_position(self.rect.centerx, self.rect.centery) == 2
-            player_on_river = get_tile_at_position(player.rect.centerx, player.rect.centery) == 2
-            river_between = abs(self_tile_x - player_tile_x) < 3 and 20 < self_tile_x < 80 and 20 < player_tile_y < 80
-            
-            if river_between and not (self_on_river or player_on_river):
-                if not self.path:
-                    bridge_tile = find_nearest_bridge(self_tile_x, self_tile_y)
-                    if bridge_tile:
-                        self.path = find_path_to_tile(self_tile_x, self_tile_y, bridge_tile[0], bridge_tile[1], map_collidables)
-                if self.path:
-                    next_tile_x, next_tile_y = self.path[0]
-                    direction = pygame.math.Vector2(
-                        (next_tile_x * TILE_SIZE + TILE_SIZE // 2) - self.rect.centerx,
-                        (next_tile_y * TILE_SIZE + TILE_SIZE // 2) - self.rect.centery
-                    )
-                    if direction.length() > 0:
-                        direction.normalize_ip()
-                    if direction.length() < 5:
-                        self.path.pop(0)
-            else:
-                direction = pygame.math.Vector2(player.rect.centerx - self.rect.centerx, player.rect.centery - self.rect.centery)
-                if direction.length() > 0:
-                    direction.normalize_ip()
-        elif self.state == "Patrol":
-            self.patrol_angle += self.patrol_speed * dt * random.choice([1, -1])
-            target_pos = self.base_position + pygame.math.Vector2(
-                self.patrol_radius * math.cos(self.patrol_angle),
-                self.patrol_radius * math.sin(self.patrol_angle)
-            )
-            direction = target_pos - pygame.math.Vector2(self.rect.center)
-            if direction.length() > 0:
-                direction.normalize_ip()
-            speed = self.speed * 0.5
-        elif self.state == "VillagePatrol":
-            self.patrol_angle += self.patrol_speed * dt * random.choice([1, -1])
-            target_pos = self.village_position + pygame.math.Vector2(
-                self.patrol_radius * math.cos(self.patrol_angle),
-                self.patrol_radius * math.sin(self.patrol_angle)
-            )
-            direction = target_pos - pygame.math.Vector2(self.rect.center)
-            if direction.length() > 0:
-                direction.normalize_ip()
-            speed = self.speed * 0.5
-        elif self.state == "ToVillage":
-            self_tile_x, self_tile_y = self.rect.centerx // TILE_SIZE, self.rect.centery // TILE_SIZE
-            village_tile_x, village_tile_y = int(self.village_position.x // TILE_SIZE), int(self.village_position.y // TILE_SIZE)
-            self_on_river = get_tile_at_position(self.rect.centerx, self.rect.centery) == 2
-            village_on_river = get_tile_at_position(self.village_position.x, self.village_position.y) == 2
-            river_between = abs(self_tile_x - village_tile_x) < 3 and 20 < self_tile_x < 80 and 20 < village_tile_y < 80
-            if river_between and not (self_on_river or village_on_river):
-                if not self.path:
-                    bridge_tile = find_nearest_bridge(self_tile_x, self_tile_y)
-                    if bridge_tile:
-                        self.path = find_path_to_tile(self_tile_x, self_tile_y, bridge_tile[0], bridge_tile[1], map_collidables)
-                if self.path:
-                    next_tile_x, next_tile_y = self.path[0]
-                    direction = pygame.math.Vector2(
-                        (next_tile_x * TILE_SIZE + TILE_SIZE // 2) - self.rect.centerx,
-                        (next_tile_y * TILE_SIZE + TILE_SIZE // 2) - self.rect.centery
-                    )
-                    if direction.length() > 0:
-                        direction.normalize_ip()
-                    if direction.length() < 5:
-                        self.path.pop(0)
-            else:
-                if not self.path:
-                    self.path = find_path_to_tile(self_tile_x, self_tile_y, village_tile_x, village_tile_y, map_collidables)
-                if self.path:
-                    next_tile_x, next_tile_y = self.path[0]
-                    direction = pygame.math.Vector2(
-                        (next_tile_x * TILE_SIZE + TILE_SIZE // 2) - self.rect.centerx,
-                        (next_tile_y * TILE_SIZE + TILE_SIZE // 2) - self.rect.centery
-                    )
-                    if direction.length() > 0:
-                        direction.normalize_ip()
-                    if direction.length() < 5:
-                        self.path.pop(0)
-                else:
-                    direction = self.village_position - pygame.math.Vector2(self.rect.center)
-                    if direction.length() > 0:
-                        direction.normalize_ip()
-            speed = self.speed
-        elif self.state == "Return":
+        self.crossing = None  # (goal tile, crossing tile or None) for the current state, see get_crossing
+
+    @property
+    def enemy_type(self):
+        return self.archetype.name
+
+    @property
+    def rect(self):
+        rect = self.image.get_rect()
+        rect.center = (int(self.batch.x[self.index]), int(self.batch.y[self.index]))
+        return rect
+
+    @property
+    def state(self):
+        return ENEMY_STATES[self.batch.state[self.index]]
+
+    @state.setter
+    def state(self, value):
+        self.batch.state[self.index] = ENEMY_STATES.index(value)
+
+    @property
+    def base_position(self):
+        return pygame.math.Vector2(self.batch.base_x[self.index], self.batch.base_y[self.index])
+
+    @property
+    def village_position(self):
+        return pygame.math.Vector2(self.batch.village_x[self.index], self.batch.village_y[self.index])
+
+    def clear_path(self):
+        self.path = []
+        self.crossing = None
+        self.batch.target_held[self.index] = False
+        cancel_path(self)
+
+    def get_crossing(self, tile_x, tile_y, goal_x, goal_y):
+        # Crossing tile to reach before heading for the goal (a position), None to head straight there. Kept until
+        # the state changes or the hop to it is walked; a moving goal only updates it between hops
+        goal = (int(goal_x // TILE_SIZE), int(goal_y // TILE_SIZE))
+        if self.crossing is None or (self.crossing[0] != goal and not self.path and not is_path_pending(self)):
+            crossing = None
+            if get_tile(tile_x, tile_y) != 2 and get_tile(*goal) != 2 and needs_crossing(tile_x, tile_y, *goal):
+                crossing = find_nearest_bridge(tile_x, tile_y, *goal)
+            self.crossing = (goal, crossing)
+        return self.crossing[1]
+
+    def follow_path(self, x, y):
+        # Center of the next path tile, None without a path. A reached tile is still steered to for this step
+        # (which centers the enemy before it turns) and dropped from the path
+        if not self.path:
+            return None
+        next_tile_x, next_tile_y = self.path[0]
+        target_x = next_tile_x * TILE_SIZE + TILE_SIZE // 2
+        target_y = next_tile_y * TILE_SIZE + TILE_SIZE // 2
+        if math.hypot(target_x - x, target_y - y) < 5:
+            self.path.pop(0)
+        return target_x, target_y
+
+    def get_hop_target(self, x, y, crossing, map_collidables):
+        if not self.path:
+            # Few bridges serve every enemy, so hops share the bridge's field like village and base routes
+            self.path = request_path(self, x // TILE_SIZE, y // TILE_SIZE, crossing[0], crossing[1], map_collidables | water_tiles, incremental=True)
+        if self.path:
+            target = self.follow_path(x, y)
             if not self.path:
-                self_tile_x, self_tile_y = self.rect.centerx // TILE_SIZE, self.rect.centery // TILE_SIZE
-                base_tile_x, base_tile_y = int(self.base_position.x // TILE_SIZE), int(self.base_position.y // TILE_SIZE)
-                self.path = find_path_to_tile(self_tile_x, self_tile_y, base_tile_x, base_tile_y, map_collidables)
-            if self.path:
-                next_tile_x, next_tile_y = self.path[0]
-                direction = pygame.math.Vector2(
-                    (next_tile_x * TILE_SIZE + TILE_SIZE // 2) - self.rect.centerx,
-                    (next_tile_y * TILE_SIZE + TILE_SIZE // 2) - self.rect.centery
-                )
-                if direction.length() > 0:
-                    direction.normalize_ip()
-                if direction.length() < 5:
-                    self.path.pop(0)
+                self.crossing = None  # At the crossing; the route is decided again from here
+            return target
+        # Head for the crossing until the path arrives
+        return crossing[0] * TILE_SIZE + TILE_SIZE // 2, crossing[1] * TILE_SIZE + TILE_SIZE // 2
+
+    def get_path_target(self, x, y, player_x, player_y, map_collidables):
+        # Point the states that follow paths steer to, and whether it stays put until reached;
+        # the batch handles everything else. x and y are this enemy's center
+        tile_x, tile_y = x // TILE_SIZE, y // TILE_SIZE
+        state = self.batch.state[self.index]
+        if state == CHASE:
+            crossing = self.get_crossing(tile_x, tile_y, player_x, player_y)
+            if crossing:
+                return self.get_hop_target(x, y, crossing, map_collidables), True
+            return (player_x, player_y), False
+        if state == TO_VILLAGE:
+            goal_x, goal_y = self.batch.village_x[self.index].item(), self.batch.village_y[self.index].item()
+            crossing = self.get_crossing(tile_x, tile_y, goal_x, goal_y)
+            if crossing:
+                return self.get_hop_target(x, y, crossing, map_collidables), True
+        elif state == RETURN:
+            goal_x, goal_y = self.batch.base_x[self.index].item(), self.batch.base_y[self.index].item()
+        else:
+            return None, False
+        if not self.path:
+            self.path = request_path(self, tile_x, tile_y, int(goal_x // TILE_SIZE), int(goal_y // TILE_SIZE), map_collidables, incremental=True)
+        target = self.follow_path(x, y)
+        return (goal_x, goal_y) if target is None else target, True
+
+    def skip_along_path(self, distance):
+        # Coarse movement out of view: jump from waypoint to waypoint without collision checks,
+        # leaving the last one to regular steering. Returns False when there was nothing to skip
+        # Past the first waypoint each one is a tile further, so this many steps hold every reachable one and the next
+        steps = self.path[:int(distance // TILE_SIZE) + 2]
+        if len(steps) < 2:
+            return False
+        x, y = self.batch.x[self.index].item(), self.batch.y[self.index].item()
+        walked = 0
+        while walked < len(steps) - 1 and distance > 0:
+            next_tile_x, next_tile_y = steps[walked]
+            target_x = next_tile_x * TILE_SIZE + TILE_SIZE // 2
+            target_y = next_tile_y * TILE_SIZE + TILE_SIZE // 2
+            gap = math.hypot(target_x - x, target_y - y)
+            if gap <= distance:
+                x, y = target_x, target_y
+                walked += 1
+                distance -= gap
             else:
-                direction = self.base_position - pygame.math.Vector2(self.rect.center)
-                if direction.length() > 0:
-                    direction.normalize_ip()
-            speed = self.speed * 1.5
-        new_position = pygame.math.Vector2(self.rect.center) + direction * speed * dt
-        new_rect = self.rect.copy()
-        new_rect.center = round(new_position.x), round(new_position.y)
-        # Collision check
-        corners = [
-            (new_rect.left + 2, new_rect.top + 2),
-            (new_rect.right - 2, new_rect.top + 2),
-            (new_rect.left + 2, new_rect.bottom - 2),
-            (new_rect.right - 2, new_rect.bottom - 2)
-        ]
-        collision = False
-        for corner_x, corner_y in corners:
-            tile = get_tile_at_position(corner_x, corner_y)
-            if tile in map_collidables:
-                collision = True
-                break
-        if not collision:
-            self.rect.center = new_rect.center
-        # Clamp to map boundaries
-        self.rect.clamp_ip(pygame.Rect(0, 0, MAP_WIDTH, MAP_HEIGHT))
-        # Attack player on contact
-        if self.rect.colliderect(player.rect) and self.attack_cooldown <= 0:
-            player.health = max(0, player.health - self.damage)
-            self.attack_cooldown = self.attack_cooldown_duration
-            print(f"{self.name} attacked player, player health: {player.health}")
+                x += round((target_x - x) * distance / gap)
+                y += round((target_y - y) * distance / gap)
+                distance = 0
+        self.batch.x[self.index], self.batch.y[self.index] = x, y
+        del self.path[:walked]
+        return True
 
     def take_damage(self, damage):
         self.health -= damage
         if self.health <= 0:
             self.alive = False
+            self.clear_path()
+            self.batch.killed.append(self)
             print(f"{self.name} killed")
 
     def draw_health_bar(self, surface, camera):
@@ -230,8 +187,319 @@ class Enemy:
         pygame.draw.rect(surface, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))
         pygame.draw.rect(surface, (200, 0, 0), (bar_x, bar_y, bar_width * health_ratio, bar_height))
         pygame.draw.rect(surface, (255, 255, 255), (bar_x, bar_y, bar_width, bar_height), 1)
-        
+
     def draw(self, surface, camera):
         if self.alive and self.visible:
             surface.blit(self.image, (self.rect.x - camera.x, self.rect.y - camera.y))
-            self.draw_health_bar(surface, camera)
\ No newline at end of file
+            self.draw_health_bar(surface, camera)
+
+class EnemyBatch:
+    # Struct-of-arrays state of every enemy, simulated in vectorized passes
+    fields = {
+        "x": np.float64, "y": np.float64,  # Rect centers, kept on whole pixels like pygame rects
+        "base_x": np.float64, "base_y": np.float64,
+        "village_x": np.float64, "village_y": np.float64,
+        "patrol_angle": np.float64,
+        "state": np.int8,
+        "state_timer": np.float64,
+        "attack_cooldown": np.float64,
+        "health": np.int32, "max_health": np.int32,
+        "alive": bool, "visible": bool,
+        "archetype": np.int16,  # EnemyArchetype id
+        "speed": np.float64,
+        "detection_range": np.float64,
+        "damage": np.int32,
+        "pending_dt": np.float64,  # Time skipped by the level of detail scheduler
+        "previous_x": np.float64, "previous_y": np.float64,  # Position before the last fixed step, for drawing
+        # Steering target of the states that follow paths; a held one is steered to in the vectorized pass
+        # until it is reached or a path is delivered
+        "target_x": np.float64, "target_y": np.float64,
+        "target_held": bool,
+    }
+
+    def __init__(self, archetypes=enemy_archetypes, capacity=64):
+        self.count = 0
+        self.capacity = 0
+        self.views = []  # Active enemies by slot; released ones leave it and go back to the pool
+        self.pool = [Enemy(self) for _ in range(capacity)]
+        self.killed = []  # Enemies killed since the last collect_killed
+        self.archetypes = archetypes
+        # Hour bitmasks per archetype id, tested against the current hour's bit
+        ordered = sorted(archetypes.values(), key=lambda archetype: archetype.id)
+        self.raid_hours = np.array([archetype.raid_hours for archetype in ordered], dtype=np.int64)
+        self.images = {}  # Archetype id -> sprite shared by every enemy of that type
+        self.rng = np.random.default_rng()
+        self.cells = np.zeros((0, 4), dtype=np.int64)  # Spatial hash cell range last reported by get_moved
+        self.simulated = None  # (x, y) while drawing at interpolated positions
+        self.allocate(capacity)
+        subscribe_tile_changes(self.on_tile_changed)
+
+    def on_tile_changed(self, tile_x, tile_y, old_tile, new_tile):
+        # Paths may have been repaired around the change, so every target is read from them again
+        self.target_held[:self.count] = False
+
+    def allocate(self, capacity):
+        for name, dtype in self.fields.items():
+            array = np.zeros(capacity, dtype=dtype)
+            if self.capacity:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        cells = np.zeros((capacity, 4), dtype=np.int64)
+        cells[:self.count] = self.cells[:self.count]
+        self.cells = cells
+        self.capacity = capacity
+
+    def get_image(self, archetype):
+        image = self.images.get(archetype.id)
+        if image is None:
+            image = pygame.Surface((ENEMY_SIZE, ENEMY_SIZE))
+            image.fill(archetype.color)
+            self.images[archetype.id] = image
+        return image
+
+    def spawn(self, x, y, name, village_position, time_system, enemy_type="Goblin"):
+        # Takes a view from the pool and places it in the next free slot
+        if self.count == self.capacity:
+            self.allocate(self.capacity * 2)
+        index = self.count
+        archetype = self.archetypes[enemy_type]
+        rect = pygame.Rect(0, 0, ENEMY_SIZE, ENEMY_SIZE)
+        rect.center = (x, y)
+        self.x[index], self.y[index] = rect.center
+        self.previous_x[index], self.previous_y[index] = rect.center
+        self.base_x[index], self.base_y[index] = x, y
+        self.village_x[index], self.village_y[index] = village_position
+        self.patrol_angle[index] = random.uniform(0, 2 * 3.14159)
+        self.state[index] = PATROL
+        self.state_timer[index] = 0
+        self.attack_cooldown[index] = 0
+        self.max_health[index] = archetype.max_health
+        self.health[index] = archetype.max_health
+        self.alive[index] = True
+        self.visible[index] = True
+        self.archetype[index] = archetype.id
+        self.speed[index] = archetype.speed
+        self.detection_range[index] = archetype.detection_range
+        self.damage[index] = archetype.damage
+        self.pending_dt[index] = 0
+        self.target_held[index] = False
+        self.count += 1
+        enemy = self.pool.pop() if self.pool else Enemy(self)
+        enemy.index = index
+        enemy.image = self.get_image(archetype)
+        enemy.name = name
+        enemy.time_system = time_system
+        enemy.archetype = archetype
+        self.views.append(enemy)
+        return enemy
+
+    def release(self, enemy):
+        # Returns an enemy to the pool; the last slot moves into its place so active slots stay packed
+        enemy.clear_path()
+        if enemy in self.killed:
+            self.killed.remove(enemy)
+        index = enemy.index
+        last = self.count - 1
+        if index != last:
+            for name in self.fields:
+                array = getattr(self, name)
+                array[index] = array[last]
+            self.cells[index] = self.cells[last]
+            moved = self.views[last]
+            moved.index = index
+            self.views[index] = moved
+        self.views.pop()
+        self.count -= 1
+        enemy.index = -1
+        self.pool.append(enemy)
+
+    def collect_killed(self):
+        killed = self.killed
+        self.killed = []
+        return killed
+
+    def update(self, dt, player, map_collidables, time_system, flow_field=None, lod=None):
+        count = self.count
+        x, y = self.x[:count], self.y[:count]
+        state = self.state[:count]
+        raid = (self.raid_hours[self.archetype[:count]] & (1 << time_system.hour)) != 0
+        active = self.alive[:count] & self.visible[:count]
+
+        # Enemies skipped by the level of detail scheduler catch up with the time they missed
+        pending_dt = self.pending_dt[:count]
+        pending_dt[active] += dt
+        far = np.zeros(count, dtype=bool)
+        if lod is not None:
+            tiers = lod.get_tiers(x, y)
+            active &= lod.get_due(tiers, np.arange(count))
+            far = active & (tiers == FAR)
+        if not active.any():
+            return
+        dt = np.where(active, pending_dt, 0)
+        pending_dt[active] = 0
+
+        # Update timers
+        self.state_timer[:count][active] -= dt[active]
+        self.attack_cooldown[:count][active] -= dt[active]
+
+        # State transitions, all decided from the states at the start of the frame
+        player_x, player_y = player.rect.center
+        player_distance = np.hypot(x - player_x, y - player_y)
+        village_distance = np.hypot(x - self.village_x[:count], y - self.village_y[:count])
+        base_distance = np.hypot(x - self.base_x[:count], y - self.base_y[:count])
+        in_range = player_distance < self.detection_range[:count]
+        to_chase = active & in_range & (state != CHASE)
+        rest = active & ~to_chase
+        to_return = rest & (((state == CHASE) & ~in_range & (self.state_timer[:count] <= 0)) | ((state == VILLAGE_PATROL) & ~raid))
+        to_village = rest & (state == PATROL) & raid
+        to_village_patrol = rest & (state == TO_VILLAGE) & (village_distance < 10)
+        to_patrol = rest & (state == RETURN) & (base_distance < 10)
+        state[to_chase] = CHASE
+        self.state_timer[:count][to_chase] = Enemy.chase_duration
+        state[to_return] = RETURN
+        state[to_village] = TO_VILLAGE
+        state[to_village_patrol] = VILLAGE_PATROL
+        state[to_patrol] = PATROL
+        new_angle = to_village_patrol | to_patrol
+        self.patrol_angle[:count][new_angle] = self.rng.uniform(0, 2 * 3.14159, int(new_angle.sum()))
+        for index in np.nonzero(to_chase | to_return | to_village | to_village_patrol | to_patrol)[0]:
+            self.views[index].clear_path()
+
+        # Movement logic
+        direction_x = np.zeros(count)
+        direction_y = np.zeros(count)
+        speed = self.speed[:count].copy()
+        patrolling = active & ((state == PATROL) | (state == VILLAGE_PATROL))
+        if patrolling.any():
+            angle = self.patrol_angle[:count]
+            angle[patrolling] += Enemy.patrol_speed * dt[patrolling] * self.rng.choice([1, -1], int(patrolling.sum()))
+            center_x = np.where(state == PATROL, self.base_x[:count], self.village_x[:count])
+            center_y = np.where(state == PATROL, self.base_y[:count], self.village_y[:count])
+            target_x = center_x[patrolling] + Enemy.patrol_radius * np.cos(angle[patrolling])
+            target_y = center_y[patrolling] + Enemy.patrol_radius * np.sin(angle[patrolling])
+            direction_x[patrolling], direction_y[patrolling] = target_x - x[patrolling], target_y - y[patrolling]
+            speed[patrolling] *= 0.5
+        chasing = active & (state == CHASE)
+        following = active & ((state == TO_VILLAGE) | (state == RETURN))
+        if chasing.any() and flow_field is not None:
+            # Follow the shared field; head straight for the player once on the last tile
+            tile_x = (x[chasing] // TILE_SIZE).astype(np.int64)
+            tile_y = (y[chasing] // TILE_SIZE).astype(np.int64)
+            next_x, next_y, found = flow_field.get_next_tiles(tile_x, tile_y)
+            on_last = (next_x == player_x // TILE_SIZE) & (next_y == player_y // TILE_SIZE)
+            target_x = np.where(on_last, player_x, next_x * TILE_SIZE + TILE_SIZE // 2)
+            target_y = np.where(on_last, player_y, next_y * TILE_SIZE + TILE_SIZE // 2)
+            direction_x[chasing] = np.where(found, target_x - x[chasing], 0)
+            direction_y[chasing] = np.where(found, target_y - y[chasing], 0)
+            outside = chasing.copy()
+            outside[chasing] = ~found
+            following |= outside
+        else:
+            following |= chasing
+        speed[state == RETURN] *= 1.5
+        # Only enemies whose target was reached, is not held, or stood in for a path that has arrived pick a new one
+        target_x, target_y = self.target_x[:count], self.target_y[:count]
+        held = self.target_held[:count]
+        held &= following & (np.hypot(target_x - x, target_y - y) >= 5)
+        for enemy in get_delivered_requesters():
+            if enemy.batch is self and enemy.index >= 0:
+                held[enemy.index] = False
+        center_x, center_y = x.tolist(), y.tolist()
+        for index in np.nonzero(following & (~held | far))[0]:
+            enemy = self.views[index]
+            if far[index] and enemy.skip_along_path(speed[index] * dt[index]):
+                # Already moved; no steering on top
+                held[index] = False
+                target_x[index], target_y[index] = x[index], y[index]
+                continue
+            target, held[index] = enemy.get_path_target(int(center_x[index]), int(center_y[index]), player_x, player_y, map_collidables)
+            if target is None:
+                held[index] = False
+                target_x[index], target_y[index] = x[index], y[index]
+            else:
+                target_x[index], target_y[index] = target
+        direction_x[following] = target_x[following] - x[following]
+        direction_y[following] = target_y[following] - y[following]
+
+        moving = active & ((direction_x != 0) | (direction_y != 0))
+        # Steps never overshoot the target, so the long catch-up steps of skipped enemies still arrive
+        distance = np.hypot(direction_x, direction_y)
+        step = np.minimum(speed * dt, distance) / np.where(distance > 0, distance, 1)
+        # Swept against the collidable tiles, sliding along walls, within the region the moving boxes can reach
+        move_x = direction_x[moving] * step[moving]
+        move_y = direction_y[moving] * step[moving]
+        if len(move_x):
+            reach_x = np.abs(move_x) + ENEMY_SIZE
+            reach_y = np.abs(move_y) + ENEMY_SIZE
+            walkable, origin = get_collision_region(int((x[moving] - reach_x).min() // TILE_SIZE), int((y[moving] - reach_y).min() // TILE_SIZE),
+                                                    int((x[moving] + reach_x).max() // TILE_SIZE) + 1, int((y[moving] + reach_y).max() // TILE_SIZE) + 1,
+                                                    map_collidables)
+        else:
+            walkable, origin = np.zeros((0, 0), dtype=bool), (0, 0)
+        new_x, new_y, blocked_x, blocked_y = move_boxes(walkable, x[moving], y[moving], ENEMY_SIZE // 2 - 2, ENEMY_SIZE // 2 - 2,
+                                                        move_x, move_y, origin)
+        x[moving] = np.round(new_x)
+        y[moving] = np.round(new_y)
+        # Clamp to map boundaries
+        x[active] = np.clip(x[active], ENEMY_SIZE // 2, MAP_WIDTH - ENEMY_SIZE // 2)
+        y[active] = np.clip(y[active], ENEMY_SIZE // 2, MAP_HEIGHT - ENEMY_SIZE // 2)
+
+        # Attack player on contact
+        player_rect = player.rect
+        touching = active & (x - ENEMY_SIZE // 2 < player_rect.right) & (player_rect.left < x + ENEMY_SIZE // 2) & \
+            (y - ENEMY_SIZE // 2 < player_rect.bottom) & (player_rect.top < y + ENEMY_SIZE // 2)
+        for index in np.nonzero(touching & (self.attack_cooldown[:count] <= 0))[0]:
+            enemy = self.views[index]
+            player.health = max(0, player.health - enemy.damage)
+            enemy.attack_cooldown = enemy.attack_cooldown_duration
+            print(f"{enemy.name} attacked player, player health: {player.health}")
+
+    def on_skip(self, time_system):
+        # Coarse outcome of skipped time: raiders wait in their village, everyone else patrols at home
+        count = self.count
+        for enemy in self.views:
+            enemy.clear_path()
+        raid = (self.raid_hours[self.archetype[:count]] & (1 << time_system.hour)) != 0
+        self.state[:count] = np.where(raid, VILLAGE_PATROL, PATROL)
+        self.x[:count] = np.where(raid, self.village_x[:count], self.base_x[:count])
+        self.y[:count] = np.where(raid, self.village_y[:count], self.base_y[:count])
+        self.state_timer[:count] = 0
+        self.attack_cooldown[:count] = 0
+        self.pending_dt[:count] = 0
+        self.store_previous()
+
+    def store_previous(self):
+        self.previous_x[:self.count] = self.x[:self.count]
+        self.previous_y[:self.count] = self.y[:self.count]
+
+    def begin_interpolation(self, alpha):
+        # Until end_interpolation, positions (and so enemy rects) are blended between the last two fixed steps
+        self.simulated = (self.x, self.y)
+        self.x = np.round(self.previous_x + (self.x - self.previous_x) * alpha)
+        self.y = np.round(self.previous_y + (self.y - self.previous_y) * alpha)
+
+    def end_interpolation(self):
+        if self.simulated:
+            self.x, self.y = self.simulated
+            self.simulated = None
+
+    def get_moved(self, cell_size):
+        # Indices of the enemies whose spatial hash cells changed since the last call
+        count = self.count
+        left = self.x[:count].astype(np.int64) - ENEMY_SIZE // 2
+        top = self.y[:count].astype(np.int64) - ENEMY_SIZE // 2
+        cells = np.stack((left // cell_size, top // cell_size, (left + ENEMY_SIZE - 1) // cell_size, (top + ENEMY_SIZE - 1) // cell_size), axis=1)
+        moved = np.nonzero((cells != self.cells[:count]).any(axis=1))[0]
+        self.cells[:count] = cells
+        return moved.tolist()
+
+    def draw(self, surface, camera):
+        # Only enemies whose sprite or health bar reaches the screen
+        count = self.count
+        x, y = self.x[:count], self.y[:count]
+        width, height = surface.get_size()
+        on_screen = self.alive[:count] & self.visible[:count] & \
+            (x + 15 >= camera.x) & (x - 15 <= camera.x + width) & \
+            (y + ENEMY_SIZE // 2 >= camera.y) & (y - ENEMY_SIZE // 2 - 10 <= camera.y + height)
+        for index in np.nonzero(on_screen)[0]:
+            self.views[index].draw(surface, camera)
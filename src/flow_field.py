@@ -0,0 +1,79 @@
+# flow_field.py
+import heapq
+import math
+import numpy as np
+
+class FlowField:
+    # Dijkstra field grown outward from a target tile; every tile within `radius` stores
+    # its next step toward the target, so any number of followers read it in O(1)
+    def __init__(self, radius, load_region, get_move_costs):
+        self.radius = radius
+        self.load_region = load_region  # (start_x, start_y, end_x, end_y) -> uint8 tiles [y, x], clipped to the map
+        self.get_move_costs = get_move_costs  # collidables -> per-tile-id cost table, inf where blocked
+        self.target = None
+        self.collidables = None
+        self.bounds = (0, 0, 0, 0)
+        self.next_step = []  # Flat window index -> window index of the next tile, -1 if unreachable
+        self.next_step_array = np.zeros(0, dtype=np.int64)  # next_step for vectorized lookups
+        self.dirty = True
+
+    def on_tile_changed(self, tile_x, tile_y, old_tile, new_tile):
+        start_x, start_y, end_x, end_y = self.bounds
+        if start_x <= tile_x < end_x and start_y <= tile_y < end_y:
+            self.dirty = True
+
+    def update(self, target_x, target_y, collidables):
+        # Rebuilt only when the target moves to another tile or the terrain around it changes
+        collidables = frozenset(collidables)
+        if not self.dirty and self.target == (target_x, target_y) and self.collidables == collidables:
+            return
+        self.target = (target_x, target_y)
+        self.collidables = collidables
+        self.dirty = False
+        tiles = self.load_region(target_x - self.radius, target_y - self.radius, target_x + self.radius + 1, target_y + self.radius + 1)
+        start_x, start_y = max(0, target_x - self.radius), max(0, target_y - self.radius)
+        height, width = tiles.shape
+        self.bounds = (start_x, start_y, start_x + width, start_y + height)
+        costs = self.get_move_costs(collidables)[tiles].ravel().tolist()
+        size = width * height
+        distance = [math.inf] * size
+        next_step = [-1] * size
+        goal = (target_y - start_y) * width + (target_x - start_x)
+        distance[goal] = 0
+        next_step[goal] = goal
+        open_set = [(0, goal)]
+        while open_set:
+            dist, node = heapq.heappop(open_set)
+            if dist > distance[node]:
+                continue
+            # Followers entering this tile pay its cost
+            step_dist = dist + costs[node]
+            x = node % width
+            for neighbor, inside in ((node - 1, x > 0), (node + 1, x < width - 1), (node - width, node >= width), (node + width, node + width < size)):
+                if inside and costs[neighbor] != math.inf and step_dist < distance[neighbor]:
+                    distance[neighbor] = step_dist
+                    next_step[neighbor] = node
+                    heapq.heappush(open_set, (step_dist, neighbor))
+        self.next_step = next_step
+        self.next_step_array = np.array(next_step, dtype=np.int64)
+
+    def get_next_tile(self, tile_x, tile_y):
+        # Next tile toward the target (the target itself when standing on it), None outside the field
+        start_x, start_y, end_x, end_y = self.bounds
+        if not (start_x <= tile_x < end_x and start_y <= tile_y < end_y):
+            return None
+        width = end_x - start_x
+        node = self.next_step[(tile_y - start_y) * width + (tile_x - start_x)]
+        if node < 0:
+            return None
+        return (start_x + node % width, start_y + node // width)
+
+    def get_next_tiles(self, tile_xs, tile_ys):
+        # get_next_tile over arrays of tiles: (next_xs, next_ys, found), next tiles undefined where not found
+        start_x, start_y, end_x, end_y = self.bounds
+        width = end_x - start_x
+        inside = (tile_xs >= start_x) & (tile_xs < end_x) & (tile_ys >= start_y) & (tile_ys < end_y)
+        nodes = np.full(len(tile_xs), -1, dtype=np.int64)
+        nodes[inside] = self.next_step_array[(tile_ys[inside] - start_y) * width + (tile_xs[inside] - start_x)]
+        found = nodes >= 0
+        return start_x + nodes % max(width, 1), start_y + nodes // max(width, 1), found
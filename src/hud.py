@@ -1,6 +1,6 @@
 # hud.py
 import pygame
-from settings import FPS, SCREEN_WIDTH, SCREEN_HEIGHT
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT
 
 class HUD:
     def __init__(self, player, time_system):
@@ -44,6 +44,50 @@ class HUD:
         }
         self.quest_modal_timer = 0
     
+    def update(self, dt):
+        # Fade timers advance here so drawing stays side-effect free
+        if self.player.interaction_prompt["text"]:
+            if self.fade_timer < self.fade_duration:
+                self.fade_timer += dt
+                self.dialogue_alpha = (self.fade_timer / self.fade_duration) * 180
+            else:
+                self.dialogue_alpha = 180
+        else:
+            if self.fade_timer > 0:
+                self.fade_timer -= dt
+                self.dialogue_alpha = (self.fade_timer / self.fade_duration) * 180
+            else:
+                self.dialogue_alpha = 0
+        if self.quest_modal:
+            self.quest_modal_timer += dt
+            if self.quest_modal_timer < self.quest_fade_duration:
+                self.quest_modal_alpha = (self.quest_modal_timer / self.quest_fade_duration) * 180
+            elif self.quest_modal_timer < self.quest_modal_duration - self.quest_fade_duration:
+                self.quest_modal_alpha = 180
+            else:
+                self.quest_modal_alpha = ((self.quest_modal_duration - self.quest_modal_timer) / self.quest_fade_duration) * 180
+            if self.quest_modal_timer >= self.quest_modal_duration:
+                self.quest_modal = None
+                self.quest_modal_alpha = 0
+                self.quest_modal_timer = 0
+
+    def get_regions(self):
+        # Screen areas the HUD draws into, each with a value that changes whenever its pixels do
+        stamina_width = int(100 * self.player.stamina / self.player.max_stamina)
+        prompt = self.player.interaction_prompt
+        npc_name = self.player.interacting_npc.name if self.player.interacting_npc else None
+        modal = self.quest_modal and (self.quest_modal["name"], self.quest_modal["status"])
+        quest_log = self.player.show_quest_log and tuple((quest.name, quest.get_progress()) for quest in self.player.quests)
+        return [
+            (pygame.Rect(SCREEN_WIDTH // 2 - 100, 10, 200, 30), self.time_system.get_time_string()),
+            (pygame.Rect(0, SCREEN_HEIGHT - 75, SCREEN_WIDTH, 75), (self.player.health, stamina_width, tuple(self.player.inventory.items))),
+            (pygame.Rect(SCREEN_WIDTH // 2 - 250, SCREEN_HEIGHT - 130, 500, 120),
+             (prompt["text"], len(prompt["options"]), npc_name, int(self.dialogue_alpha))),
+            (pygame.Rect(SCREEN_WIDTH - 800, 50, 400, 100), (modal, int(self.quest_modal_alpha))),
+            (pygame.Rect(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 - 100, 300, 200),
+             (self.player.show_inventory, tuple(self.player.inventory.items), quest_log))
+        ]
+
     def draw(self, surface):
         # Draw time display (top center)
         time_text = self.font.render(self.time_system.get_time_string(), True, (255, 255, 255))
@@ -69,11 +113,6 @@ class HUD:
         surface.blit(inventory_text, (10, SCREEN_HEIGHT - 30))
         # Draw interaction prompt
         if self.player.interaction_prompt["text"]:
-            if self.fade_timer < self.fade_duration:
-                self.fade_timer += 1 / FPS
-                self.dialogue_alpha = (self.fade_timer / self.fade_duration) * 180
-            else:
-                self.dialogue_alpha = 180
             # Create dialogue box surface
             box_width, box_height = 500, 120
             box_surface = pygame.Surface((box_width, box_height), pygame.SRCALPHA)
@@ -91,38 +130,20 @@ class HUD:
                 options_surface = self.font.render(options_text, True, (255, 255, 255))
                 box_surface.blit(options_surface, (10, 90))
             surface.blit(box_surface, (SCREEN_WIDTH // 2 - box_width // 2, SCREEN_HEIGHT - box_height - 10))
-        else:
-            if self.fade_timer > 0:
-                self.fade_timer -= 1 / FPS
-                self.dialogue_alpha = (self.fade_timer / self.fade_duration) * 180
-            else:
-                self.dialogue_alpha = 0
         if self.quest_modal:
-            self.quest_modal_timer += 1 / FPS
-            if self.quest_modal_timer < self.quest_fade_duration:
-                self.quest_modal_alpha = (self.quest_modal_timer / self.quest_fade_duration) * 180
-            elif self.quest_modal_timer < self.quest_modal_duration - self.quest_fade_duration:
-                self.quest_modal_alpha = 180
-            else:
-                self.quest_modal_alpha = ((self.quest_modal_duration - self.quest_modal_timer) / self.quest_fade_duration) * 180
-            if self.quest_modal_timer >= self.quest_modal_duration:
-                self.quest_modal = None
-                self.quest_modal_alpha = 0
-                self.quest_modal_timer = 0
-            else:
-                box_width, box_height = 400, 100
-                box_surface = pygame.Surface((box_width, box_height), pygame.SRCALPHA)
-                box_surface.fill((0, 0, 0, int(self.quest_modal_alpha)))
-                pygame.draw.rect(box_surface, (255, 255, 255), (0, 0, box_width, box_height), 2)
-                name_text = self.font.render(self.quest_modal["name"], True, (255, 255, 255))
-                box_surface.blit(name_text, (10, 20))
-                lines = self.wrap_text(self.quest_modal["description"], 280, self.small_font)
-                for i, line in enumerate(lines[:2]):
-                    desc_text = self.small_font.render(line, True, (255, 255, 255))
-                    box_surface.blit(desc_text, (10, 40 + i * 20))
-                status_text = self.small_font.render(self.quest_modal["status"], True, (255, 255, 255))
-                box_surface.blit(status_text, (10, 80))
-                surface.blit(box_surface, (SCREEN_WIDTH - box_width - box_width, 50))
+            box_width, box_height = 400, 100
+            box_surface = pygame.Surface((box_width, box_height), pygame.SRCALPHA)
+            box_surface.fill((0, 0, 0, int(self.quest_modal_alpha)))
+            pygame.draw.rect(box_surface, (255, 255, 255), (0, 0, box_width, box_height), 2)
+            name_text = self.font.render(self.quest_modal["name"], True, (255, 255, 255))
+            box_surface.blit(name_text, (10, 20))
+            lines = self.wrap_text(self.quest_modal["description"], 280, self.small_font)
+            for i, line in enumerate(lines[:2]):
+                desc_text = self.small_font.render(line, True, (255, 255, 255))
+                box_surface.blit(desc_text, (10, 40 + i * 20))
+            status_text = self.small_font.render(self.quest_modal["status"], True, (255, 255, 255))
+            box_surface.blit(status_text, (10, 80))
+            surface.blit(box_surface, (SCREEN_WIDTH - box_width - box_width, 50))
         # Draw inventory panel
         if self.player.show_inventory:
             box_width, box_height = 300, 200
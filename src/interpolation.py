@@ -0,0 +1,27 @@
+# interpolation.py
+
+class Interpolator:
+    # Rect centers from before the last fixed simulation step; drawing blends them toward the current ones
+    def __init__(self):
+        self.previous = {}
+        self.current = {}
+
+    def store(self, entities):
+        self.previous = {entity: entity.rect.center for entity in entities}
+
+    def apply(self, entities, alpha):
+        # Moves rects to their blended centers until restore
+        self.current = {}
+        for entity in entities:
+            previous = self.previous.get(entity)
+            if previous is None:
+                continue
+            current = entity.rect.center
+            self.current[entity] = current
+            entity.rect.center = (round(previous[0] + (current[0] - previous[0]) * alpha),
+                                  round(previous[1] + (current[1] - previous[1]) * alpha))
+
+    def restore(self):
+        for entity, center in self.current.items():
+            entity.rect.center = center
+        self.current = {}
@@ -0,0 +1,36 @@
+# lighting.py
+import numpy as np
+import pygame
+from settings import LIGHTING_KEYFRAMES
+
+def build_lighting_table(keyframes):
+    # One row per minute of the day: darkness alpha and the multiply colour it darkens the screen with
+    hours = np.array([keyframe[0] for keyframe in keyframes], dtype=np.float64)
+    values = np.array([[keyframe[1], *keyframe[2]] for keyframe in keyframes], dtype=np.float64)
+    # Repeat the first keyframe a day later so the curve wraps smoothly past midnight
+    hours = np.append(hours, hours[0] + 24) * 60
+    values = np.vstack((values, values[:1]))
+    minutes = np.arange(24 * 60) + hours[0]
+    curve = np.stack([np.interp(minutes, hours, values[:, channel]) for channel in range(4)], axis=1)
+    curve = np.roll(curve, int(hours[0]), axis=0)
+    alpha = curve[:, :1]
+    # Full alpha multiplies by the tint, zero alpha leaves the screen untouched
+    multiply = 255 - (255 - curve[:, 1:]) * alpha / 255
+    return np.hstack((alpha, multiply)).round().astype(np.int64)
+
+lighting_table = build_lighting_table(LIGHTING_KEYFRAMES)
+
+class LightingOverlay:
+    # Screen-sized multiply surface, refilled only when the minute's table entry changes
+    def __init__(self, size):
+        self.surface = pygame.Surface(size)
+        self.color = None
+
+    def draw(self, surface, time_system):
+        color = time_system.get_lighting_color()
+        if color == (255, 255, 255):
+            return  # Full daylight: nothing to darken
+        if color != self.color:
+            self.color = color
+            self.surface.fill(color)
+        surface.blit(self.surface, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
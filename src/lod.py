@@ -0,0 +1,42 @@
+# lod.py
+import numpy as np
+
+NEAR, MID, FAR = range(3)
+
+class LODScheduler:
+    # AI level of detail by distance to the camera view: near entities update every frame,
+    # mid range ones every few frames and far ones rarely, each time with all the time it skipped
+    def __init__(self, camera, view_width, view_height, near_margin, mid_margin, mid_interval, far_interval):
+        self.camera = camera
+        self.view_width = view_width
+        self.view_height = view_height
+        self.near_margin = near_margin
+        self.mid_margin = mid_margin
+        self.intervals = np.array([1, mid_interval, far_interval])  # Frames between updates per tier
+        self.frame = 0
+        self.pending = {}  # Entity -> time accumulated while skipped (entities updated one by one)
+
+    def advance(self):
+        self.frame += 1
+
+    def get_tiers(self, x, y):
+        # Tier of each position, from its distance to the view rect (0 inside it)
+        left, top = self.camera.x, self.camera.y
+        distance_x = np.maximum(np.maximum(left - x, x - (left + self.view_width)), 0)
+        distance_y = np.maximum(np.maximum(top - y, y - (top + self.view_height)), 0)
+        distance = np.maximum(distance_x, distance_y)
+        return np.where(distance <= self.near_margin, NEAR, np.where(distance <= self.near_margin + self.mid_margin, MID, FAR))
+
+    def get_due(self, tiers, ids):
+        # Entities updating this frame; ids stagger the skipped ones across frames
+        return (self.frame + ids) % self.intervals[tiers] == 0
+
+    def get_step(self, entity, entity_id, dt):
+        # Time to simulate for one entity this frame, 0 while it is skipped
+        pending = self.pending.get(entity, 0) + dt
+        tier = self.get_tiers(entity.rect.centerx, entity.rect.centery)
+        if not self.get_due(tier, entity_id):
+            self.pending[entity] = pending
+            return 0
+        self.pending.pop(entity, None)
+        return pending
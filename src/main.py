@@ -4,16 +4,22 @@ import platform
 import asyncio
 import sys
 from settings import *
-from map import draw_map, draw_minimap, collidable_tiles
+from map import draw_map, draw_minimap, collidable_tiles, update_streaming, update_player_flow_field, player_flow_field, poll_paths, get_walkable_region
 from player import Player
 from camera import Camera
 from npc import NPC
 from hud import HUD
-from enemy import Enemy
+from enemy import EnemyBatch
+from spawner import Spawner, load_zones, DEFAULT_SPAWN_PATH
 from time_system import TimeSystem
 from weather import WeatherSystem
 from menu import MainMenu
 from pause_menu import PauseMenu
+from renderer import DirtyRectRenderer
+from spatial_hash import SpatialHash
+from lod import LODScheduler
+from interpolation import Interpolator
+from lighting import LightingOverlay
 
 async def show_menu():
     menu = MainMenu()
@@ -53,22 +59,75 @@ async def main():
             NPC(25 * TILE_SIZE, 45 * TILE_SIZE, "Villager1", "Welcome to our village!", time_system),
             NPC(65 * TILE_SIZE, 55 * TILE_SIZE, "Villager2", "The river is beautiful today.", time_system)
         ]
-        enemies = [
-            Enemy(25 * TILE_SIZE, 75 * TILE_SIZE, "Goblin1", (25 * TILE_SIZE, 45 * TILE_SIZE), time_system),
-            Enemy(75 * TILE_SIZE, 25 * TILE_SIZE, "Goblin2", (65 * TILE_SIZE, 55 * TILE_SIZE), time_system),
-            Enemy(30 * TILE_SIZE, 45 * TILE_SIZE, "Wolf1", (25 * TILE_SIZE, 45 * TILE_SIZE), time_system, "Wolf")
-        ]
-        # Lighting overlay
-        lighting_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        lighting_surface.fill((50, 50, 50))
+        enemy_batch = EnemyBatch(capacity=ENEMY_POOL_SIZE)
+        spawner = Spawner(enemy_batch, load_zones(DEFAULT_SPAWN_PATH, enemy_batch.archetypes), time_system,
+                          lambda *bounds: get_walkable_region(*bounds, collidable_tiles))
+        enemies = enemy_batch.views  # Active enemies only; updated in place as the spawner adds and releases them
+        entity_index = SpatialHash(ENTITY_CELL_SIZE)
+        lod = LODScheduler(camera, SCREEN_WIDTH, SCREEN_HEIGHT, AI_LOD_NEAR_MARGIN, AI_LOD_MID_MARGIN, AI_LOD_MID_INTERVAL, AI_LOD_FAR_INTERVAL)
+        entity_index.insert(player, "player")
+        for npc in npcs:
+            entity_index.insert(npc, "npc")
+        spawned, released = spawner.update()
+        for enemy in spawned:
+            entity_index.insert(enemy, "enemy")
+        lighting = LightingOverlay((SCREEN_WIDTH, SCREEN_HEIGHT))
         weather_system = WeatherSystem(time_system)
         pause_menu = PauseMenu(screen)
         paused = False
         zoom_enabled = False
         mouse_clicked = False
+        renderer = DirtyRectRenderer(screen) if DIRTY_RECT_RENDERING else None
+        minimap_rect = pygame.Rect(SCREEN_WIDTH - MINIMAP_SIZE - 10, 10, MINIMAP_SIZE, MINIMAP_SIZE)
+        # Fixed-step simulation; frames draw entities blended between the last two steps
+        tick = 1.0 / SIMULATION_TICK_RATE
+        accumulator = 0.0
+        interpolator = Interpolator()
+        time_system.subscribe("skip", enemy_batch.on_skip)
+        
+        def apply_spawns():
+            spawned, released = spawner.update()
+            for enemy in released:
+                entity_index.remove(enemy)
+            for enemy in spawned:
+                entity_index.insert(enemy, "enemy")
+        
+        def simulate(dt):
+            player.update(dt, npcs, enemies, hud, entity_index)
+            entity_index.update(player)
+            update_player_flow_field(player, collidable_tiles)
+            poll_paths()
+            lod.advance()
+            apply_spawns()
+            enemy_batch.update(dt, player, collidable_tiles, time_system, player_flow_field, lod)
+            for index in enemy_batch.get_moved(ENTITY_CELL_SIZE):
+                entity_index.update(enemy_batch.views[index])
+            for index, npc in enumerate(npcs):
+                npc_dt = lod.get_step(npc, index, dt)
+                if npc_dt:
+                    npc.update(npc_dt, time_system)
+                    entity_index.update(npc)
+            time_system.update(dt)
+            # Enemies released by the hour change leave the index before the next tick's player update can hit them
+            apply_spawns()
+            weather_system.update(dt)
+        
+        def draw_scene():
+            screen.fill((20, 20, 30))
+            draw_map(screen, camera)
+            for npc in npcs:
+                npc.draw(screen, camera)
+            enemy_batch.draw(screen, camera)
+            player.draw(screen, camera)
+            lighting.draw(screen, time_system)
+            weather_system.draw(screen)
+            draw_minimap(screen, camera, player, npcs, enemies, zoom_enabled)
+            hud.draw(screen)
+            if paused:
+                pause_menu.draw()
         
         while True:
-            dt = clock.tick(FPS) / 1000.0
+            frame_dt = clock.tick(FPS) / 1000.0
             mouse_pos = pygame.mouse.get_pos()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -83,11 +142,20 @@ async def main():
                     if event.key == pygame.K_t and not player.in_dialogue:
                         player.show_quest_log = not player.show_quest_log
                         print(f"Quest log toggled: {player.show_quest_log}")
+                    if event.key == pygame.K_z and not (paused or player.in_dialogue):
+                        time_system.skip(SLEEP_HOURS * 60)
+                        # Teleported entities neither blend from their old spots nor keep stale index cells
+                        apply_spawns()
+                        for npc in npcs:
+                            entity_index.update(npc)
+                        for index in enemy_batch.get_moved(ENTITY_CELL_SIZE):
+                            entity_index.update(enemy_batch.views[index])
+                        interpolator.store(npcs + [player])
+                        print(f"Slept {SLEEP_HOURS} hours: {time_system.get_time_string()}")
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     mouse_clicked = True
                     if not paused:
                         mouse_x, mouse_y = event.pos
-                        minimap_rect = pygame.Rect(SCREEN_WIDTH - MINIMAP_SIZE - 10, 10, MINIMAP_SIZE, MINIMAP_SIZE)
                         if minimap_rect.collidepoint(mouse_x, mouse_y):
                             zoom_enabled = not zoom_enabled
             if paused:
@@ -99,31 +167,35 @@ async def main():
                     break
             else:
                 if not (player.show_inventory or player.show_quest_log):
-                    player.update(dt, npcs, enemies, hud)
-                    for enemy in enemies:
-                        enemy.update(dt, player, collidable_tiles, time_system)
-                    for npc in npcs:
-                        npc.update(dt, time_system)
-                    time_system.update(dt)
-                    weather_system.update(dt)
+                    accumulator += frame_dt
+                    steps = 0
+                    while accumulator >= tick and steps < MAX_SIMULATION_STEPS:
+                        interpolator.store(npcs + [player])
+                        enemy_batch.store_previous()
+                        simulate(tick)
+                        accumulator -= tick
+                        steps += 1
+                    accumulator = min(accumulator, tick)
+                interpolator.apply(npcs + [player], accumulator / tick)
+                enemy_batch.begin_interpolation(accumulator / tick)
                 # Atualiza a câmera
                 camera.update()
+                update_streaming(camera, player)
+            hud.update(frame_dt)
             # Desenha
-            screen.fill((20, 20, 30))
-            draw_map(screen, camera)
-            for npc in npcs:
-                npc.draw(screen, camera)
-            for enemy in enemies:
-                enemy.draw(screen, camera)
-            player.draw(screen, camera)
-            lighting_surface.set_alpha(time_system.get_lighting_alpha())
-            screen.blit(lighting_surface, (0, 0))
-            weather_system.draw(screen)
-            draw_minimap(screen, camera, player, npcs, enemies, zoom_enabled)
-            hud.draw(screen)
-            if paused:
-                pause_menu.draw()
-            pygame.display.flip()
+            if renderer:
+                entities = npcs + enemies + [player]
+                full_state = (paused, time_system.get_lighting_color(), weather_system.weather_type)
+                regions = hud.get_regions()
+                regions.append((minimap_rect, (zoom_enabled, tuple(renderer.get_entity_state(entity, camera) for entity in entities))))
+                if paused:
+                    regions += pause_menu.get_regions(mouse_pos)
+                renderer.render(draw_scene, camera, entities, full_state, regions, not paused and weather_system.is_animating())
+            else:
+                draw_scene()
+                pygame.display.flip()
+            interpolator.restore()
+            enemy_batch.end_interpolation()
             mouse_clicked = False
             await asyncio.sleep(1.0 / FPS)
 
@@ -1,51 +1,20 @@
 # map.py
 import pygame
-from settings import TILE_SIZE, MAP_WIDTH, MAP_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT, MINIMAP_SIZE
-import heapq
-
-# Simulated chunk-based map (single 100x100 chunk for now)
-CHUNK_SIZE = 50  # Tiles per chunk (for future expansion)
-chunks = {(0, 0): []}  # Dictionary of chunks: (chunk_x, chunk_y) -> tile data
-
-# Mapa 100x100 com rio, montanhas, ruas e vilarejos
-map_data = []
-for y in range(100):
-    row = []
-    for x in range(100):
-        # Base de grama
-        tile = 0
-        # Rio diagonal (corta do canto superior esquerdo para inferior direito)
-        if abs(x - y) < 3 and -1 < x < 100 and -1 < y < 100:
-            tile = 2
-        # Montanhas (região nordeste e sudoeste)
-        if (x > 70 and y < 30) or (x < 30 and y > 70):
-            if (x + y) % 7 < 4:
-                tile = 1
-        # Caverna nas montanhas sudoeste (3x3 área)
-        if 23 <= x <= 27 and 73 <= y <= 77:
-            tile = 5
-        # Caverna nas montanhas nordeste (3x3 área)
-        if 73 <= x <= 77 and 23 <= y <= 27:
-            tile = 5 
-        # Vilarejos (dois vilarejos com ruas)
-        # Vilarejo 1 (centro-esquerda)
-        if 20 < x < 30 and 45 < y < 55:
-            tile = 3
-            # Ruas no vilarejo 1
-            if x == 25 or y == 50:
-                tile = 4
-        # Vilarejo 2 (centro-direita)
-        if 60 < x < 70 and 45 < y < 55:
-            tile = 3
-            # Ruas no vilarejo 2
-            if x == 65 or y == 50:
-                tile = 4
-        # Estrada principal conectando vilarejos
-        if (y == 50 and 30 <= x <= 60) or (x == 45 and 50 <= y <= 60):
-            tile = 4
-        row.append(tile)
-    map_data.append(row)
-chunks[(0, 0)] = map_data
+from settings import (TILE_SIZE, MAP_WIDTH, MAP_HEIGHT, MAP_TILES_X, MAP_TILES_Y, SCREEN_WIDTH, SCREEN_HEIGHT, MINIMAP_SIZE,
+                      CHUNK_SIZE, CHUNK_LOAD_MARGIN, CHUNK_PREFETCH_DISTANCE, CHUNK_PREFETCH_PER_FRAME, CHUNK_MEMORY_BUDGET,
+                      CHUNK_WORKERS, WORLD_SEED, PATH_CACHE_SIZE, HIERARCHICAL_PATH_DISTANCE, FLOW_FIELD_RADIUS,
+                      PATH_WORKERS, PATH_STRATEGY, PATH_WINDOW_MARGIN)
+from collections import OrderedDict
+import atexit
+import platform
+import threading
+import numpy as np
+from worldgen import ChunkGenerator, generate_region
+from map_file import open_map_file, DEFAULT_MAP_PATH
+from pathfinding import PathEngine, PathService
+from flow_field import FlowField
+from terrain import TerrainIndex
+import math
 
 tile_colors = {
     0: (50, 200, 50),   # Grama
@@ -57,149 +26,443 @@ tile_colors = {
 }
 
 collidable_tiles = {1}
+water_tiles = {2}
 
-def get_neighbors(x, y, collidables):
-    neighbors = []
-    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:  # 4-directional movement
-        nx, ny = x + dx, y + dy
-        if 0 <= nx < 100 and 0 <= ny < 100:
-            tile = chunks[(0, 0)][ny][nx]
-            if tile not in collidables:
-                neighbors.append((nx, ny))
-    return neighbors
-
-def find_nearest_bridge(start_x, start_y):
-    bridge_tiles = []
-    for x in range(30, 61):
-        if chunks[(0, 0)][50][x] == 4:
-            bridge_tiles.append((x, 50))
-    for y in range(50, 61):
-        if chunks[(0, 0)][y][45] == 4:
-            bridge_tiles.append((45, y))
-    if not bridge_tiles:
+# Movement cost per tile for planners that weigh terrain (wading through the river is slow)
+tile_move_costs = {
+    0: 1.0,
+    1: math.inf,
+    2: 5.0,
+    3: 1.0,
+    4: 1.0,
+    5: 1.0,
+}
+
+def get_border_color(color):
+    return (min(color[0]+20, 255), min(color[1]+20, 255), min(color[2]+20, 255))
+
+tile_border_colors = {tile: get_border_color(color) for tile, color in tile_colors.items()}
+
+# Lookup tables indexed by tile id, parallel to the uint8 tile arrays
+TILE_COLORS = np.full((256, 3), (255, 0, 0), dtype=np.uint8)
+TILE_BORDER_COLORS = np.full((256, 3), get_border_color((255, 0, 0)), dtype=np.uint8)
+TILE_PASSABLE = np.ones(256, dtype=bool)
+TILE_MOVE_COST = np.ones(256, dtype=np.float32)
+for tile, color in tile_colors.items():
+    TILE_COLORS[tile] = color
+    TILE_BORDER_COLORS[tile] = tile_border_colors[tile]
+for tile in collidable_tiles:
+    TILE_PASSABLE[tile] = False
+for tile, cost in tile_move_costs.items():
+    TILE_MOVE_COST[tile] = cost
+
+def get_passable_lut(collidables):
+    if collidables is collidable_tiles:
+        return TILE_PASSABLE
+    passable = np.ones(256, dtype=bool)
+    passable[list(collidables)] = False
+    return passable
+
+def get_move_cost_lut(collidables):
+    costs = TILE_MOVE_COST.copy()
+    costs[list(collidables)] = math.inf
+    return costs
+
+# Baked map file, memory-mapped; chunks fall back to procedural generation when it is missing
+map_file = open_map_file(DEFAULT_MAP_PATH, WORLD_SEED, MAP_TILES_X, MAP_TILES_Y, CHUNK_SIZE)
+# Background generation for the procedural fallback (browsers have no worker processes)
+chunk_generator = ChunkGenerator(WORLD_SEED, 0 if platform.system() == "Emscripten" else CHUNK_WORKERS)
+atexit.register(chunk_generator.shutdown)
+
+def read_chunk_tiles(chunk_key):
+    if map_file is not None:
+        return map_file.read_chunk(*chunk_key)
+    return chunk_generator.generate_now(chunk_key)
+
+class Chunk:
+    def __init__(self, chunk_x, chunk_y, tiles):
+        self.chunk_x = chunk_x
+        self.chunk_y = chunk_y
+        self.tiles = tiles  # uint8 array of tile ids, indexed [local_y, local_x]
+        self.surface = None  # Baked on first draw
+        self.start_x = chunk_x * CHUNK_SIZE
+        self.start_y = chunk_y * CHUNK_SIZE
+        self.height, self.width = tiles.shape
+
+    def memory_size(self):
+        size = self.tiles.nbytes
+        if self.surface is not None:
+            size += self.surface.get_width() * self.surface.get_height() * self.surface.get_bytesize()
+        return size
+
+# Resident chunks in least-recently-used order: (chunk_x, chunk_y) -> Chunk
+chunks = OrderedDict()
+chunks_x = math.ceil(MAP_TILES_X / CHUNK_SIZE)
+chunks_y = math.ceil(MAP_TILES_Y / CHUNK_SIZE)
+# Tiles changed at runtime, reapplied when an evicted chunk is loaded again
+tile_overrides = {}
+resident_memory = 0
+pinned_chunks = set()  # Chunks around the camera, never evicted
+# Held while the chunk cache or tile overrides change or a region is read from them, since path workers read windows too
+chunk_lock = threading.RLock()
+prefetch_queue = []
+last_player_position = None
+
+def is_valid_chunk(chunk_key):
+    return 0 <= chunk_key[0] < chunks_x and 0 <= chunk_key[1] < chunks_y
+
+def load_chunk(chunk_key):
+    return insert_chunk(chunk_key, read_chunk_tiles(chunk_key))
+
+def insert_chunk(chunk_key, tiles):
+    global resident_memory
+    chunk = Chunk(chunk_key[0], chunk_key[1], tiles)
+    with chunk_lock:
+        for (tile_x, tile_y), tile in tile_overrides.items():
+            if (tile_x // CHUNK_SIZE, tile_y // CHUNK_SIZE) == chunk_key:
+                chunk.tiles[tile_y - chunk.start_y, tile_x - chunk.start_x] = tile
+        chunks[chunk_key] = chunk
+        resident_memory += chunk.memory_size()
+        evict_chunks()
+    return chunk
+
+def evict_chunks():
+    global resident_memory
+    with chunk_lock:
+        for chunk_key in list(chunks):
+            if resident_memory <= CHUNK_MEMORY_BUDGET:
+                break
+            if chunk_key in pinned_chunks:
+                continue
+            resident_memory -= chunks.pop(chunk_key).memory_size()
+
+def request_chunk(chunk_key):
+    # Makes a chunk resident without blocking when it has to be generated
+    with chunk_lock:
+        if chunk_key in chunks:
+            chunks.move_to_end(chunk_key)
+        elif map_file is not None:
+            load_chunk(chunk_key)
+        else:
+            chunk_generator.request(chunk_key)
+
+def receive_chunks():
+    with chunk_lock:
+        for chunk_key, tiles in chunk_generator.poll():
+            if chunk_key not in chunks:
+                insert_chunk(chunk_key, tiles)
+
+# Callbacks run as callback(tile_x, tile_y, old_tile, new_tile) after set_tile changes a tile
+tile_listeners = []
+
+def subscribe_tile_changes(callback):
+    tile_listeners.append(callback)
+
+def unsubscribe_tile_changes(callback):
+    if callback in tile_listeners:
+        tile_listeners.remove(callback)
+
+def get_chunk(chunk_key):
+    with chunk_lock:
+        chunk = chunks.get(chunk_key)
+        if chunk is None:
+            return load_chunk(chunk_key)
+        chunks.move_to_end(chunk_key)
+        return chunk
+
+def get_tile(tile_x, tile_y):
+    if not (0 <= tile_x < MAP_TILES_X and 0 <= tile_y < MAP_TILES_Y):
         return None
-    closest_bridge = min(
-        bridge_tiles,
-        key=lambda b: (b[0] - start_x) ** 2 + (b[1] - start_y) ** 2
-    )
-    return closest_bridge
-
-def find_path_to_tile(start_x, start_y, goal_x, goal_y, collidables):
-    open_set = [(0, (start_x, start_y))]
-    came_from = {}
-    g_score = {(start_x, start_y): 0}
-    f_score = {(start_x, start_y): abs(goal_x - start_x) + abs(goal_y - start_y)}
-    while open_set:
-        current_f, current = heapq.heappop(open_set)
-        if current == (goal_x, goal_y):
-            path = []
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
-            return path[::-1]
-        for neighbor in get_neighbors(*current, collidables):
-            tentative_g = g_score[current] + 1
-            if tentative_g < g_score.get(neighbor, float('inf')):
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g
-                f_score[neighbor] = tentative_g + abs(neighbor[0] - goal_x) + abs(neighbor[1] - goal_y)
-                heapq.heappush(open_set, (f_score[neighbor], neighbor))
-    return []  # No path found
+    chunk_key = (tile_x // CHUNK_SIZE, tile_y // CHUNK_SIZE)
+    chunk = chunks.get(chunk_key)
+    if chunk is None:
+        chunk = load_chunk(chunk_key)
+    return chunk.tiles.item(tile_y - chunk.start_y, tile_x - chunk.start_x)
+
+def clip_region(start_x, start_y, end_x, end_y):
+    return max(0, start_x), max(0, start_y), min(MAP_TILES_X, end_x), min(MAP_TILES_Y, end_y)
+
+def get_region(start_x, start_y, end_x, end_y):
+    # Tile ids of a region in tile coordinates (end exclusive), loading the chunks it covers
+    start_x, start_y, end_x, end_y = clip_region(start_x, start_y, end_x, end_y)
+    region = np.zeros((max(0, end_y - start_y), max(0, end_x - start_x)), dtype=np.uint8)
+    with chunk_lock:
+        for chunk_y in range(start_y // CHUNK_SIZE, (end_y - 1) // CHUNK_SIZE + 1):
+            for chunk_x in range(start_x // CHUNK_SIZE, (end_x - 1) // CHUNK_SIZE + 1):
+                chunk = get_chunk((chunk_x, chunk_y))
+                x0, y0 = max(start_x, chunk.start_x), max(start_y, chunk.start_y)
+                x1, y1 = min(end_x, chunk.start_x + chunk.width), min(end_y, chunk.start_y + chunk.height)
+                region[y0 - start_y:y1 - start_y, x0 - start_x:x1 - start_x] = \
+                    chunk.tiles[y0 - chunk.start_y:y1 - chunk.start_y, x0 - chunk.start_x:x1 - chunk.start_x]
+    return region
+
+def sample_region(start_x, start_y, end_x, end_y, step=1):
+    # Same as get_region, sampled every `step` tiles and without making any chunk resident
+    start_x, start_y, end_x, end_y = clip_region(start_x, start_y, end_x, end_y)
+    if map_file is not None:
+        region = map_file.read_region(start_x, start_y, end_x, end_y, step)
+    else:
+        region = generate_region(WORLD_SEED, start_x, start_y, end_x, end_y, step)
+    for (tile_x, tile_y), tile in tile_overrides.items():
+        if start_x <= tile_x < end_x and start_y <= tile_y < end_y and (tile_x - start_x) % step == 0 and (tile_y - start_y) % step == 0:
+            region[(tile_y - start_y) // step, (tile_x - start_x) // step] = tile
+    return region
+
+def get_collidable_tiles_in_rect(rect, collidables=collidable_tiles):
+    # Tile coordinates of every collidable tile overlapping a world-space rect
+    start_x, start_y = int(rect.left // TILE_SIZE), int(rect.top // TILE_SIZE)
+    end_x, end_y = int((rect.right - 1) // TILE_SIZE) + 1, int((rect.bottom - 1) // TILE_SIZE) + 1
+    start_x, start_y, end_x, end_y = clip_region(start_x, start_y, end_x, end_y)
+    blocked = ~get_passable_lut(collidables)[get_region(start_x, start_y, end_x, end_y)]
+    tile_ys, tile_xs = np.nonzero(blocked)
+    return list(zip((tile_xs + start_x).tolist(), (tile_ys + start_y).tolist()))
+
+# Path and terrain windows are read through the chunk cache, so they count against the memory budget
+path_engine = PathEngine(MAP_TILES_X, MAP_TILES_Y, get_region, PATH_CACHE_SIZE, CHUNK_SIZE, HIERARCHICAL_PATH_DISTANCE, PATH_STRATEGY, PATH_WINDOW_MARGIN)
+subscribe_tile_changes(path_engine.on_tile_changed)
+
+terrain_index = TerrainIndex(MAP_TILES_X, MAP_TILES_Y, get_region, collidable_tiles, water_tiles, CHUNK_SIZE)
+subscribe_tile_changes(terrain_index.on_tile_changed)
+
+def find_nearest_bridge(start_x, start_y, goal_x=None, goal_y=None):
+    return terrain_index.find_nearest_crossing(start_x, start_y, goal_x, goal_y)
+
+def needs_crossing(start_x, start_y, goal_x, goal_y):
+    return terrain_index.needs_crossing(start_x, start_y, goal_x, goal_y)
+
+def find_path_to_tile(start_x, start_y, goal_x, goal_y, collidables, strategy=None):
+    # strategy: "astar" or "jps", PATH_STRATEGY when None; also searches the segments of HPA* paths
+    # (from HIERARCHICAL_PATH_DISTANCE tiles apart)
+    return path_engine.find_path(start_x, start_y, goal_x, goal_y, collidables, strategy)
+
+def get_walkable_region(start_x, start_y, end_x, end_y, collidables, load_region=sample_region):
+    # [y, x] grid of a region clipped to the map, nonzero where walkable, and the tile it starts at
+    start_x, start_y, end_x, end_y = clip_region(start_x, start_y, end_x, end_y)
+    return get_passable_lut(collidables)[load_region(start_x, start_y, end_x, end_y)], (start_x, start_y)
+
+def peek_region(start_x, start_y, end_x, end_y):
+    # Same as get_region, but chunks that are not resident are read through sample_region instead of loaded
+    start_x, start_y, end_x, end_y = clip_region(start_x, start_y, end_x, end_y)
+    region = np.zeros((max(0, end_y - start_y), max(0, end_x - start_x)), dtype=np.uint8)
+    for chunk_y in range(start_y // CHUNK_SIZE, (end_y - 1) // CHUNK_SIZE + 1):
+        for chunk_x in range(start_x // CHUNK_SIZE, (end_x - 1) // CHUNK_SIZE + 1):
+            x0, y0 = max(start_x, chunk_x * CHUNK_SIZE), max(start_y, chunk_y * CHUNK_SIZE)
+            x1, y1 = min(end_x, (chunk_x + 1) * CHUNK_SIZE), min(end_y, (chunk_y + 1) * CHUNK_SIZE)
+            chunk = chunks.get((chunk_x, chunk_y))
+            if chunk is None:
+                tiles = sample_region(x0, y0, x1, y1)
+            else:
+                tiles = chunk.tiles[y0 - chunk.start_y:y1 - chunk.start_y, x0 - chunk.start_x:x1 - chunk.start_x]
+            region[y0 - start_y:y1 - start_y, x0 - start_x:x1 - start_x] = tiles
+    return region
+
+def get_collision_region(start_x, start_y, end_x, end_y, collidables):
+    # Walkable region for movement. Movers far from the view (which follow paths anyway) still collide with
+    # the real tiles, read without making their chunks resident
+    return get_walkable_region(start_x, start_y, max(start_x, end_x), max(start_y, end_y), collidables, peek_region)
+
+# Searches off the main thread for entities that can keep moving while they wait (no threads in browsers)
+path_service = PathService(path_engine, 0 if platform.system() == "Emscripten" else PATH_WORKERS)
+atexit.register(path_service.shutdown)
+
+def request_path(requester, start_x, start_y, goal_x, goal_y, collidables, incremental=False):
+    # incremental: deliver a path down the goal's shared field, repaired when tiles change (see set_tile), for
+    # goals many enemies head to (village, base, bridges). Plain paths are cached and searched with PATH_STRATEGY, or HPA*
+    return path_service.request(requester, start_x, start_y, goal_x, goal_y, collidables, incremental)
+
+def is_path_pending(requester):
+    return path_service.is_pending(requester)
+
+def get_delivered_requesters():
+    return path_service.get_delivered()
+
+def cancel_path(requester):
+    path_service.cancel(requester)
+
+def poll_paths():
+    path_service.poll()
+
+# Shared field toward the player, read by every chasing enemy
+player_flow_field = FlowField(FLOW_FIELD_RADIUS, get_region, get_move_cost_lut)
+subscribe_tile_changes(player_flow_field.on_tile_changed)
+
+def update_player_flow_field(player, collidables):
+    player_flow_field.update(player.rect.centerx // TILE_SIZE, player.rect.centery // TILE_SIZE, collidables)
+
+def draw_tile(surface, tile, x, y):
+    color = tile_colors.get(tile, (255, 0, 0))
+    border_color = tile_border_colors.get(tile, get_border_color(color))
+    rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
+    pygame.draw.rect(surface, color, rect)
+    pygame.draw.rect(surface, border_color, rect, 1)
+
+def bake_chunk(chunk):
+    global resident_memory
+    chunk_surface = pygame.Surface((chunk.width * TILE_SIZE, chunk.height * TILE_SIZE))
+    if pygame.display.get_surface():
+        chunk_surface = chunk_surface.convert()
+    # Expand every tile to a TILE_SIZE block with a one pixel lighter border, then upload in one go
+    border = np.ones((TILE_SIZE, TILE_SIZE), dtype=bool)
+    border[1:-1, 1:-1] = False
+    pixels = np.where(
+        border[np.newaxis, :, np.newaxis, :, np.newaxis],
+        TILE_BORDER_COLORS[chunk.tiles][:, np.newaxis, :, np.newaxis, :],
+        TILE_COLORS[chunk.tiles][:, np.newaxis, :, np.newaxis, :]
+    ).reshape(chunk.height * TILE_SIZE, chunk.width * TILE_SIZE, 3)
+    pygame.surfarray.blit_array(chunk_surface, pixels.transpose(1, 0, 2))
+    resident_memory -= chunk.memory_size()
+    chunk.surface = chunk_surface
+    resident_memory += chunk.memory_size()
+    return chunk_surface
+
+def get_chunk_surface(chunk):
+    if chunk.surface is None:
+        bake_chunk(chunk)
+        evict_chunks()
+    return chunk.surface
+
+def set_tile(tile_x, tile_y, tile):
+    old_tile = get_tile(tile_x, tile_y)
+    if old_tile in (None, tile):
+        return
+    with chunk_lock:
+        tile_overrides[(tile_x, tile_y)] = tile
+        chunk = get_chunk((tile_x // CHUNK_SIZE, tile_y // CHUNK_SIZE))
+        local_x, local_y = tile_x - chunk.start_x, tile_y - chunk.start_y
+        chunk.tiles[local_y, local_x] = tile
+    # Repaint only the changed tile in the baked surface
+    if chunk.surface is not None:
+        draw_tile(chunk.surface, tile, local_x * TILE_SIZE, local_y * TILE_SIZE)
+    update_minimap_tile(tile_x, tile_y, tile)
+    for callback in list(tile_listeners):
+        callback(tile_x, tile_y, old_tile, tile)
+
+def get_view_chunk_range(camera, margin=0):
+    start_x = int(camera.x // (CHUNK_SIZE * TILE_SIZE)) - margin
+    start_y = int(camera.y // (CHUNK_SIZE * TILE_SIZE)) - margin
+    end_x = int((camera.x + SCREEN_WIDTH - 1) // (CHUNK_SIZE * TILE_SIZE)) + margin
+    end_y = int((camera.y + SCREEN_HEIGHT - 1) // (CHUNK_SIZE * TILE_SIZE)) + margin
+    return max(0, start_x), max(0, start_y), min(chunks_x - 1, end_x), min(chunks_y - 1, end_y)
+
+def update_streaming(camera, player):
+    global last_player_position
+    # Keep the chunks around the view resident and mark them as recently used
+    start_x, start_y, end_x, end_y = get_view_chunk_range(camera, CHUNK_LOAD_MARGIN)
+    with chunk_lock:
+        pinned_chunks.clear()
+        for chunk_y in range(start_y, end_y + 1):
+            for chunk_x in range(start_x, end_x + 1):
+                pinned_chunks.add((chunk_x, chunk_y))
+                request_chunk((chunk_x, chunk_y))
+    # Request the chunks ahead of the player's movement
+    position = player.rect.center
+    if last_player_position is not None:
+        move_x = (position[0] > last_player_position[0]) - (position[0] < last_player_position[0])
+        move_y = (position[1] > last_player_position[1]) - (position[1] < last_player_position[1])
+        if move_x or move_y:
+            view_x, view_y, view_end_x, view_end_y = get_view_chunk_range(camera)
+            for distance in range(1, CHUNK_PREFETCH_DISTANCE + 1):
+                for chunk_y in range(view_y, view_end_y + 1):
+                    for chunk_x in range(view_x, view_end_x + 1):
+                        chunk_key = (chunk_x + move_x * distance, chunk_y + move_y * distance)
+                        if is_valid_chunk(chunk_key) and chunk_key not in prefetch_queue:
+                            request_chunk(chunk_key)
+                            prefetch_queue.append(chunk_key)
+    last_player_position = position
+    receive_chunks()
+    # Bake a few prefetched chunks per frame so they are ready when they scroll into view
+    baked = 0
+    for chunk_key in list(prefetch_queue):
+        if baked >= CHUNK_PREFETCH_PER_FRAME:
+            break
+        chunk = chunks.get(chunk_key)
+        if chunk is None and chunk_generator.is_pending(chunk_key):
+            continue  # Still generating
+        prefetch_queue.remove(chunk_key)
+        if chunk is not None and chunk.surface is None:
+            get_chunk_surface(chunk)
+            baked += 1
 
 def draw_map(surface, camera):
-    start_x = max(0, int(camera.x // TILE_SIZE))
-    end_x = min(100, start_x + (SCREEN_WIDTH // TILE_SIZE) + 2)
-    start_y = max(0, int(camera.y // TILE_SIZE))
-    end_y = min(100, start_y + (SCREEN_HEIGHT // TILE_SIZE) + 2)
-    chunk = chunks[(0, 0)]
-    for y in range(start_y, end_y):
-        for x in range(start_x, end_x):
-            tile = chunk[y][x]
-            color = tile_colors.get(tile, (255, 0, 0))
-            rect = pygame.Rect(x * TILE_SIZE - camera.x, y * TILE_SIZE - camera.y, TILE_SIZE, TILE_SIZE)
-            pygame.draw.rect(surface, color, rect)
-            pygame.draw.rect(surface, (min(color[0]+20, 255), min(color[1]+20, 255), min(color[2]+20, 255)), rect, 1)
-            
+    # Entities are drawn at int(world - camera), so the view starts at the ceiling of the camera position
+    view_rect = pygame.Rect(math.ceil(camera.x), math.ceil(camera.y), SCREEN_WIDTH, SCREEN_HEIGHT)
+    start_x, start_y, end_x, end_y = get_view_chunk_range(camera)
+    for chunk_y in range(start_y, end_y + 1):
+        for chunk_x in range(start_x, end_x + 1):
+            chunk = get_chunk((chunk_x, chunk_y))
+            chunk_surface = get_chunk_surface(chunk)
+            chunk_rect = chunk_surface.get_rect(topleft=(chunk.start_x * TILE_SIZE, chunk.start_y * TILE_SIZE))
+            visible_rect = chunk_rect.clip(view_rect)
+            if visible_rect.width and visible_rect.height:
+                area = visible_rect.move(-chunk_rect.x, -chunk_rect.y)
+                surface.blit(chunk_surface, (visible_rect.x - view_rect.x, visible_rect.y - view_rect.y), area)
+
+# Whole map at one pixel per minimap_step tiles, built once and patched by set_tile; only the tiles
+# the unzoomed minimap can show are read
+minimap_step = max(1, math.ceil(max(MAP_TILES_X, MAP_TILES_Y) / MINIMAP_SIZE))
+minimap_base = None
+minimap_full = None  # minimap_base scaled to fit the minimap
+minimap_zoom = {"window": None, "surface": None}  # Last zoomed window and its scaled surface
+minimap_surface = None
+
+def get_minimap_base():
+    global minimap_base
+    if minimap_base is None:
+        region = sample_region(0, 0, MAP_TILES_X, MAP_TILES_Y, minimap_step)
+        minimap_base = pygame.surfarray.make_surface(TILE_COLORS[region].transpose(1, 0, 2))
+    return minimap_base
+
+def update_minimap_tile(tile_x, tile_y, tile):
+    global minimap_full
+    window = minimap_zoom["window"]
+    if window is not None and window.collidepoint(tile_x, tile_y):
+        minimap_zoom["window"] = None
+    if minimap_base is None or tile_x % minimap_step or tile_y % minimap_step:
+        return
+    minimap_base.set_at((tile_x // minimap_step, tile_y // minimap_step), tile_colors.get(tile, (255, 0, 0)))
+    minimap_full = None
+
 def draw_minimap(surface, camera, player, npcs, enemies, zoom_enabled):
-    minimap_surface = pygame.Surface((MINIMAP_SIZE, MINIMAP_SIZE))
+    global minimap_full, minimap_surface
+    if minimap_surface is None:
+        minimap_surface = pygame.Surface((MINIMAP_SIZE, MINIMAP_SIZE))
     minimap_surface.fill((20, 20, 30))
-    chunk = chunks[(0, 0)]
-    map_tiles = 100
     if zoom_enabled:
+        # Centered on the player, four pixels per tile
         tile_scale = 4.0
-        tiles_visible = MINIMAP_SIZE / tile_scale
+        half_tiles = MINIMAP_SIZE / tile_scale / 2
         player_tile_x = player.rect.centerx / TILE_SIZE
         player_tile_y = player.rect.centery / TILE_SIZE
-        start_x = max(0, int(player_tile_x - tiles_visible / 2))
-        start_y = max(0, int(player_tile_y - tiles_visible / 2))
-        start_x = max(0, min(len(chunk[0]) - int(tiles_visible), start_x))
-        start_y = max(0, min(len(chunk) - int(tiles_visible), start_y))
-        end_x = min(map_tiles, start_x + int(tiles_visible))
-        end_y = min(map_tiles, start_y + int(tiles_visible))
-        offset_x = MINIMAP_SIZE / 2 - (player_tile_x - start_x) * tile_scale
-        offset_y = MINIMAP_SIZE / 2 - (player_tile_y - start_y) * tile_scale
+        origin_x = player_tile_x - half_tiles
+        origin_y = player_tile_y - half_tiles
+        window = pygame.Rect(math.floor(origin_x), math.floor(origin_y), math.ceil(half_tiles * 2) + 1, math.ceil(half_tiles * 2) + 1)
+        window = window.clip(pygame.Rect(0, 0, MAP_TILES_X, MAP_TILES_Y))
+        if minimap_zoom["window"] != window:
+            # Read at full resolution, but only the tiles around the player
+            minimap_zoom["window"] = window
+            region = sample_region(window.left, window.top, window.right, window.bottom)
+            minimap_zoom["surface"] = pygame.transform.scale(pygame.surfarray.make_surface(TILE_COLORS[region].transpose(1, 0, 2)),
+                                                             (int(window.width * tile_scale), int(window.height * tile_scale)))
+        minimap_surface.blit(minimap_zoom["surface"], (int((window.x - origin_x) * tile_scale), int((window.y - origin_y) * tile_scale)))
     else:
-        tile_scale = 2.0
-        start_x = 0
-        start_y = 0
-        end_x = map_tiles
-        end_y = map_tiles
-        offset_x = 0
-        offset_y = 0
-        for y in range(start_y, end_y):
-            for x in range(start_x, end_x):
-                tile = chunk[y][x]
-                color = tile_colors.get(tile, (255, 0, 0))
-                rect = pygame.Rect(
-                    offset_x + (x - start_x) * tile_scale,
-                    offset_y + (y - start_y) * tile_scale,
-                    tile_scale,
-                    tile_scale
-                )
-                if 0 <= rect.x < MINIMAP_SIZE and 0 <= rect.y < MINIMAP_SIZE:
-                    pygame.draw.rect(minimap_surface, color, rect)
-        # Draw NPCs
-        for npc in npcs:
-            tile_x = npc.rect.centerx / TILE_SIZE
-            tile_y = npc.rect.centery / TILE_SIZE
-            if start_x <= tile_x < end_x and start_y <= tile_y < end_y:
-                minimap_x = offset_x + (tile_x - start_x) * tile_scale
-                minimap_y = offset_y + (tile_y - start_y) * tile_scale
-                if 0 <= minimap_x < MINIMAP_SIZE and 0 <= minimap_y < MINIMAP_SIZE:
-                    pygame.draw.circle(minimap_surface, (255, 0, 255), (int(minimap_x), int(minimap_y)), 3)
-        # Draw enemies
-        for enemy in enemies:
-            if enemy.alive and enemy.visible:
-                tile_x = enemy.rect.centerx / TILE_SIZE
-                tile_y = enemy.rect.centery / TILE_SIZE
-                if start_x <= tile_x < end_x and start_y <= tile_y < end_y:
-                    minimap_x = offset_x + (tile_x - start_x) * tile_scale
-                    minimap_y = offset_y + (tile_y - start_y) * tile_scale
-                    if 0 <= minimap_x < MINIMAP_SIZE and 0 <= minimap_y < MINIMAP_SIZE:
-                        pygame.draw.circle(minimap_surface, (255, 0, 0), (int(minimap_x), int(minimap_y)), 3)
-        # Draw player
-        tile_x = player.rect.centerx / TILE_SIZE
-        tile_y = player.rect.centery / TILE_SIZE
-        if start_x <= tile_x < end_x and start_y <= tile_y < end_y:
-            minimap_x = offset_x + (tile_x - start_x) * tile_scale
-            minimap_y = offset_y + (tile_y - start_y) * tile_scale
-            if 0 <= minimap_x < MINIMAP_SIZE and 0 <= minimap_y < MINIMAP_SIZE:
-                pygame.draw.circle(minimap_surface, (255, 255, 0), (int(minimap_x), int(minimap_y)), 3)
+        tile_scale = MINIMAP_SIZE / max(MAP_TILES_X, MAP_TILES_Y)
+        origin_x = 0
+        origin_y = 0
+        if minimap_full is None:
+            minimap_full = pygame.transform.scale(get_minimap_base(), (int(MAP_TILES_X * tile_scale), int(MAP_TILES_Y * tile_scale)))
+        minimap_surface.blit(minimap_full, (0, 0))
+    # Markers are the only part redrawn every frame
+    markers = [(npc.rect.center, (255, 0, 255)) for npc in npcs]
+    markers += [(enemy.rect.center, (255, 0, 0)) for enemy in enemies if enemy.alive and enemy.visible]
+    markers.append((player.rect.center, (255, 255, 0)))
+    for (x, y), color in markers:
+        minimap_x = (x / TILE_SIZE - origin_x) * tile_scale
+        minimap_y = (y / TILE_SIZE - origin_y) * tile_scale
+        if 0 <= minimap_x < MINIMAP_SIZE and 0 <= minimap_y < MINIMAP_SIZE:
+            pygame.draw.circle(minimap_surface, color, (int(minimap_x), int(minimap_y)), 3)
     # Draw border
     pygame.draw.rect(minimap_surface, (200, 200, 200), (0, 0, MINIMAP_SIZE, MINIMAP_SIZE), 2)
     surface.blit(minimap_surface, (SCREEN_WIDTH - MINIMAP_SIZE - 10, 10))
-    # Debug minimap click
-    if pygame.mouse.get_pressed()[0]:
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        if SCREEN_WIDTH - MINIMAP_SIZE - 10 <= mouse_x < SCREEN_WIDTH - 10 and 10 <= mouse_y < 10 + MINIMAP_SIZE:
-            print(f"Minimap clicked. Player: ({tile_x:.1f}, {tile_y:.1f}) -> ({minimap_x:.1f}, {minimap_y:.1f})")
 
 def get_tile_at_position(x, y):
-    chunk = chunks.get((0, 0), None)
-    if not chunk:
-        return None
-    tile_x = int(x // TILE_SIZE)
-    tile_y = int(y // TILE_SIZE)
-    if 0 <= tile_y < 100 and 0 <= tile_x < 100:
-        return chunk[tile_y][tile_x]
-    return None
+    return get_tile(int(x // TILE_SIZE), int(y // TILE_SIZE))
\ No newline at end of file
@@ -0,0 +1,119 @@
+# map_file.py
+import math
+import mmap
+import os
+import struct
+import numpy as np
+from settings import MAP_FILE
+
+# Binary map layout (little endian):
+#   header: magic, version, chunk size, world seed, width and height in tiles, chunk columns and rows
+#   offset table: one uint64 per chunk (row-major), pointing at that chunk's tiles
+#   chunk data: raw uint8 tile ids, row-major, partial chunks at the right and bottom edges
+MAGIC = b"TDRPGMAP"
+VERSION = 2
+HEADER_FORMAT = "<8sHHIIIII"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+DEFAULT_MAP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", MAP_FILE)
+
+class MapFile:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = None
+        self.offsets = None
+        try:
+            self.load()
+        except (OSError, ValueError, struct.error):
+            self.close()
+            raise
+
+    def load(self):
+        # Only the header and offset table are parsed here; chunk pages are read by the OS on first access.
+        # Everything is checked against the file size so a truncated file fails here, not mid-game
+        size = os.fstat(self.file.fileno()).st_size
+        if size < HEADER_SIZE:
+            raise ValueError(f"{self.path} is too short for a map file header")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.chunk_size, self.seed, self.width, self.height, self.chunks_x, self.chunks_y = \
+            struct.unpack_from(HEADER_FORMAT, self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} map file")
+        if not self.chunk_size or (self.chunks_x, self.chunks_y) != (math.ceil(self.width / self.chunk_size), math.ceil(self.height / self.chunk_size)):
+            raise ValueError(f"{self.path} has an inconsistent chunk grid")
+        if size < HEADER_SIZE + self.chunks_x * self.chunks_y * 8:
+            raise ValueError(f"{self.path} has a truncated offset table")
+        self.offsets = np.frombuffer(self.data, dtype="<u8", count=self.chunks_x * self.chunks_y, offset=HEADER_SIZE)
+        widths = np.minimum(self.chunk_size, self.width - np.arange(self.chunks_x) * self.chunk_size)
+        heights = np.minimum(self.chunk_size, self.height - np.arange(self.chunks_y) * self.chunk_size)
+        if np.any(self.offsets + np.outer(heights, widths).ravel().astype(np.uint64) > size):
+            raise ValueError(f"{self.path} has truncated chunk data")
+
+    def get_chunk_shape(self, chunk_x, chunk_y):
+        width = min(self.chunk_size, self.width - chunk_x * self.chunk_size)
+        height = min(self.chunk_size, self.height - chunk_y * self.chunk_size)
+        return height, width
+
+    def chunk_view(self, chunk_x, chunk_y):
+        # Read-only array backed directly by the mapped file
+        height, width = self.get_chunk_shape(chunk_x, chunk_y)
+        offset = int(self.offsets[chunk_y * self.chunks_x + chunk_x])
+        return np.frombuffer(self.data, dtype=np.uint8, count=width * height, offset=offset).reshape(height, width)
+
+    def read_chunk(self, chunk_x, chunk_y):
+        return self.chunk_view(chunk_x, chunk_y).copy()
+
+    def read_region(self, start_x, start_y, end_x, end_y, step=1):
+        xs = np.arange(start_x, end_x, step)
+        ys = np.arange(start_y, end_y, step)
+        region = np.zeros((len(ys), len(xs)), dtype=np.uint8)
+        if not len(xs) or not len(ys):
+            return region
+        size = self.chunk_size
+        for chunk_y in range(ys[0] // size, ys[-1] // size + 1):
+            row_start, row_end = np.searchsorted(ys, [chunk_y * size, (chunk_y + 1) * size])
+            for chunk_x in range(xs[0] // size, xs[-1] // size + 1):
+                col_start, col_end = np.searchsorted(xs, [chunk_x * size, (chunk_x + 1) * size])
+                if row_start == row_end or col_start == col_end:
+                    continue
+                view = self.chunk_view(chunk_x, chunk_y)
+                region[row_start:row_end, col_start:col_end] = view[np.ix_(
+                    ys[row_start:row_end] - chunk_y * size, xs[col_start:col_end] - chunk_x * size)]
+        return region
+
+    def close(self):
+        self.offsets = None  # Release the view on the mapping before closing it
+        if self.data is not None:
+            self.data.close()
+        self.file.close()
+
+def write_map_file(path, seed, width, height, chunk_size, chunk_tiles):
+    # chunk_tiles yields the uint8 tile array of every chunk in row-major order
+    chunks_x = math.ceil(width / chunk_size)
+    chunks_y = math.ceil(height / chunk_size)
+    offsets = np.zeros(chunks_x * chunks_y, dtype="<u8")
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, chunk_size, seed, width, height, chunks_x, chunks_y))
+        file.write(offsets.tobytes())
+        for index, tiles in enumerate(chunk_tiles):
+            offsets[index] = file.tell()
+            file.write(np.ascontiguousarray(tiles, dtype=np.uint8).tobytes())
+        file.seek(HEADER_SIZE)
+        file.write(offsets.tobytes())
+    os.replace(temp_path, path)
+
+def open_map_file(path, seed, width, height, chunk_size):
+    if not os.path.exists(path):
+        return None
+    try:
+        map_file = MapFile(path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Could not open map file {path}: {e}")
+        return None
+    if (map_file.seed, map_file.width, map_file.height, map_file.chunk_size) != (seed, width, height, chunk_size):
+        print(f"Map file {path} is {map_file.width}x{map_file.height} with chunk size {map_file.chunk_size} and seed {map_file.seed}, "
+              f"expected {width}x{height} with chunk size {chunk_size} and seed {seed}; using procedural generation")
+        map_file.close()
+        return None
+    return map_file
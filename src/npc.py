@@ -28,6 +28,7 @@ class NPC:
                 "quest_params": {
                     "name": "Kill Wolf",
                     "description": "Kill Wolf1 at night (21:00-5:59).",
+                    "target": "Wolf1",
                     "start_hour": 21,
                     "end_hour": 6,
                     "reward": "Sword"
@@ -78,6 +79,24 @@ class NPC:
             }
         }
         self.last_quest_day = 0
+        self.target_position = self.base_position
+        time_system.subscribe("hour", self.on_hour)
+        time_system.subscribe("skip", self.on_skip)
+        self.on_hour(time_system)
+
+    def on_hour(self, time_system):
+        # Greeting and schedule target only change on the hour
+        hour = time_system.hour
+        if 6 <= hour < 12:
+            self.dialogue = f"{self.name}: Good morning!"
+        elif 12 <= hour < 18:
+            self.dialogue = f"{self.name}: Good afternoon!"
+        else:
+            self.dialogue = f"{self.name}: Good night!"
+        for start, end, pos in self.schedule:
+            if (start <= hour < end) or (end < start and (hour >= start or hour < end)):
+                self.target_position = pos
+                break
 
     def draw(self, surface, camera):
         if self.alive:
@@ -130,13 +149,13 @@ class NPC:
                 quest = KillQuest(
                     quest_info["quest_params"]["name"],
                     quest_info["quest_params"]["description"],
-                    enemies[2] if self.name == "Villager1" else None,
+                    quest_info["quest_params"]["target"],
                     quest_info["quest_params"]["start_hour"],
                     quest_info["quest_params"]["end_hour"],
                     quest_info["quest_params"]["reward"],
                     self
                 )
-            quest.start()
+            quest.start(self.time_system)
             player.quests.append(quest)
             self.quest_status = "accepted"
             self.current_dialogue = "greeting"
@@ -157,22 +176,20 @@ class NPC:
             self.alive = False
             print(f"{self.name} killed")
 
+    def on_skip(self, time_system):
+        # After a time skip the NPC is wherever its schedule says
+        if self.alive:
+            self.rect.center = round(self.target_position.x), round(self.target_position.y)
+            self.rect.clamp_ip(pygame.Rect(0, 0, MAP_WIDTH, MAP_HEIGHT))
+
     def update(self, dt, time_system):
         if not self.alive:
             return
-        hour = time_system.hour
-        if 6 <= hour < 12:
-            self.dialogue = f"{self.name}: Good morning!"
-        elif 12 <= hour < 18:
-            self.dialogue = f"{self.name}: Good afternoon!"
-        else:
-            self.dialogue = f"{self.name}: Good night!"
-        for start, end, pos in self.schedule:
-            if (start <= hour < end) or (end < start and (hour >= start or hour < end)):
-                direction = pos - pygame.math.Vector2(self.rect.center)
-                if direction.length() > 5:
-                    direction.normalize_ip()
-                    new_pos = pygame.math.Vector2(self.rect.center) + direction * self.speed * dt
-                    self.rect.center = round(new_pos.x), round(new_pos.y)
-                break
+        direction = self.target_position - pygame.math.Vector2(self.rect.center)
+        if direction.length() > 5:
+            # Never overshoot, so large catch-up steps from the AI level of detail land on the spot
+            step = min(self.speed * dt, direction.length())
+            direction.normalize_ip()
+            new_pos = pygame.math.Vector2(self.rect.center) + direction * step
+            self.rect.center = round(new_pos.x), round(new_pos.y)
         self.rect.clamp_ip(pygame.Rect(0, 0, MAP_WIDTH, MAP_HEIGHT))
\ No newline at end of file
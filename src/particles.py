@@ -0,0 +1,117 @@
+# particles.py
+import itertools
+import numpy as np
+import pygame
+
+STAMP_MAX_PIXELS = 32  # Sprites up to this size are written straight into the pixel array instead of blitted
+
+class ParticleBatch:
+    # Fixed pool of particles in preallocated arrays; dead slots are reused by spawn and every particle shares one sprite
+    def __init__(self, capacity, sprite, offset=(0, 0)):
+        self.capacity = capacity
+        self.sprite = sprite
+        self.offset = offset  # Sprite top-left relative to the particle position
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.life = np.zeros(capacity)  # Seconds left before the particle dies even if still in bounds
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.rng = np.random.default_rng()
+        # Opaque pixels of small sprites as offsets and colours; one blit per particle costs more than the pixels
+        self.stamp = None
+        self.stamp_colors = None  # Stamp colours mapped to the target surface's pixel format
+        if sprite.get_width() * sprite.get_height() <= STAMP_MAX_PIXELS:
+            alpha = pygame.surfarray.array_alpha(sprite)
+            offset_x, offset_y = np.nonzero(alpha)
+            colors = [tuple(sprite.get_at((int(x), int(y)))) for x, y in zip(offset_x, offset_y)]
+            self.stamp = (offset_x + offset[0], offset_y + offset[1], colors)
+
+    def get_count(self):
+        return int(np.count_nonzero(self.alive))
+
+    def clear(self):
+        self.alive[:] = False
+
+    def spawn(self, count, x_range, y_range, vx_range, vy_range, life):
+        # Ranges are (low, high) pairs sampled uniformly; only as many particles as there are free slots spawn
+        free = np.flatnonzero(~self.alive)[:count]
+        count = len(free)
+        if not count:
+            return 0
+        self.x[free] = self.rng.uniform(*x_range, count)
+        self.y[free] = self.rng.uniform(*y_range, count)
+        self.vx[free] = self.rng.uniform(*vx_range, count)
+        self.vy[free] = self.rng.uniform(*vy_range, count)
+        self.life[free] = life
+        self.alive[free] = True
+        return count
+
+    def seed(self, count, x_range, y_range, vx_range, vy_range, life, bounds):
+        # Fills the pool in one step as if `count` particles had spawned evenly over the last `life` seconds:
+        # each is aged a random time and kept if it would still be inside bounds, as many as there are free slots
+        x = self.rng.uniform(*x_range, count)
+        y = self.rng.uniform(*y_range, count)
+        vx = self.rng.uniform(*vx_range, count)
+        vy = self.rng.uniform(*vy_range, count)
+        age = self.rng.uniform(0, life, count)
+        x += vx * age
+        y += vy * age
+        left, top, right, bottom = bounds
+        keep = np.flatnonzero((x >= left) & (x < right) & (y >= top) & (y < bottom))
+        free = np.flatnonzero(~self.alive)[:len(keep)]
+        keep = keep[:len(free)]
+        self.x[free] = x[keep]
+        self.y[free] = y[keep]
+        self.vx[free] = vx[keep]
+        self.vy[free] = vy[keep]
+        self.life[free] = life - age[keep]
+        self.alive[free] = True
+        return len(free)
+
+    def update(self, dt, bounds, jitter=0):
+        # Moves every live particle and kills those past their lifetime or outside bounds (left, top, right, bottom)
+        alive = np.flatnonzero(self.alive)
+        if not len(alive):
+            return
+        x = self.x[alive] + self.vx[alive] * dt
+        y = self.y[alive] + self.vy[alive] * dt
+        if jitter:
+            x += self.rng.uniform(-jitter, jitter, len(alive)) * dt
+        life = self.life[alive] - dt
+        left, top, right, bottom = bounds
+        self.x[alive] = x
+        self.y[alive] = y
+        self.life[alive] = life
+        self.alive[alive] = (life > 0) & (x >= left) & (x < right) & (y >= top) & (y < bottom)
+
+    def draw(self, surface):
+        # Small sprites are stamped with one vectorized write, larger ones drawn with a single blits call;
+        # particles whose sprite lies off the surface are skipped either way
+        alive = np.flatnonzero(self.alive)
+        x = self.x[alive].astype(np.int64)
+        y = self.y[alive].astype(np.int64)
+        if self.stamp is not None:
+            self.draw_stamped(surface, x, y)
+            return
+        width, height = surface.get_size()
+        sprite_width, sprite_height = self.sprite.get_size()
+        left = x + self.offset[0]
+        top = y + self.offset[1]
+        visible = (left < width) & (top < height) & (left + sprite_width > 0) & (top + sprite_height > 0)
+        positions = np.stack((left[visible], top[visible]), axis=1).tolist()
+        surface.blits(zip(itertools.repeat(self.sprite), positions), doreturn=False)
+
+    def draw_stamped(self, surface, x, y):
+        # Overwrites the covered pixels like pygame.draw does; needs a 32-bit surface
+        offset_x, offset_y, colors = self.stamp
+        if self.stamp_colors is None:
+            self.stamp_colors = np.array([surface.map_rgb(color) for color in colors], dtype=np.uint32)
+        width, height = surface.get_size()
+        pixel_x = (x[:, None] + offset_x).ravel()
+        pixel_y = (y[:, None] + offset_y).ravel()
+        color_index = np.tile(np.arange(len(colors)), len(x))
+        inside = (pixel_x >= 0) & (pixel_x < width) & (pixel_y >= 0) & (pixel_y < height)
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[pixel_x[inside], pixel_y[inside]] = self.stamp_colors[color_index[inside]]
+        del pixels  # Unlocks the surface
@@ -0,0 +1,908 @@
+# pathfinding.py
+import heapq
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import math
+import threading
+import weakref
+import numpy as np
+
+class GridWindow:
+    # Walkability of a rectangle of the map, 1 where walkable. Node ids are local to the window
+    # (y * width + x counted from its top-left tile), so searches never allocate for the whole map
+    def __init__(self, start_x, start_y, width, height, cells, collidables):
+        self.start_x = start_x
+        self.start_y = start_y
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.cells = cells  # bytearray, patched in place by the engine for tracked paths
+        self.collidables = collidables
+
+    def contains(self, tile_x, tile_y):
+        return self.start_x <= tile_x < self.start_x + self.width and self.start_y <= tile_y < self.start_y + self.height
+
+    def get_node(self, tile_x, tile_y):
+        return (tile_y - self.start_y) * self.width + tile_x - self.start_x
+
+    def get_tile(self, node):
+        return (self.start_x + node % self.width, self.start_y + node // self.width)
+
+class PathEngine:
+    # A* over the grid window spanning each query's start and goal (plus a margin), read on demand
+    def __init__(self, width, height, load_region, cache_size=256, cluster_size=None, hierarchical_distance=None, strategy="astar", window_margin=25):
+        self.width = width
+        self.height = height
+        self.load_region = load_region  # (start_x, start_y, end_x, end_y) -> uint8 tiles [y, x], clipped to the map
+        self.window_margin = window_margin  # Tiles searched around the box spanning start and goal
+        self.collidable_sets = set()  # Every frozenset(collidables) windows were built for
+        self.cache = OrderedDict()  # (start, goal, collidables) -> path tuple
+        self.cache_size = cache_size
+        # Queries at least hierarchical_distance tiles apart go through an HPA* planner per collidable set
+        self.cluster_size = cluster_size
+        self.hierarchical_distance = hierarchical_distance
+        self.planners = {}  # frozenset(collidables) -> HierarchicalPlanner
+        self.version = 0  # Bumped whenever walkability changes
+        self.strategy = strategy  # Default search: "astar" or "jps"
+        self.jump_stops = None  # (grid, stops scanning left, stops scanning right) for the last JPS grid
+        self.goal_fields = weakref.WeakSet()  # Live GoalFields repaired on tile changes
+        # Scratch arrays reused by every search and grown to the largest window; entries are valid only where visited == search_id
+        self.g_score = array("i")
+        self.came_from = array("i")
+        self.visited = array("i")
+        self.search_id = 0
+
+    def register(self, collidables):
+        # Tile changes are checked against every collidable set a window was read for
+        key = frozenset(collidables)
+        self.collidable_sets.add(key)
+        return key
+
+    def get_window(self, start_x, start_y, end_x, end_y, collidables):
+        return self.read_window(start_x, start_y, end_x, end_y, self.register(collidables))
+
+    def read_window(self, start_x, start_y, end_x, end_y, collidables):
+        # Also called from worker threads, with collidables already registered on the main thread
+        start_x, start_y = max(0, start_x), max(0, start_y)
+        end_x, end_y = min(self.width, end_x), min(self.height, end_y)
+        blocked = np.isin(self.load_region(start_x, start_y, end_x, end_y), list(collidables))
+        return GridWindow(start_x, start_y, end_x - start_x, end_y - start_y, bytearray((~blocked).astype(np.uint8).tobytes()), collidables)
+
+    def get_query_bounds(self, start_x, start_y, goal_x, goal_y, margin=None):
+        if margin is None:
+            margin = self.window_margin
+        return (max(0, min(start_x, goal_x) - margin), max(0, min(start_y, goal_y) - margin),
+                min(self.width, max(start_x, goal_x) + margin + 1), min(self.height, max(start_y, goal_y) + margin + 1))
+
+    def get_query_window(self, start_x, start_y, goal_x, goal_y, collidables, margin=None):
+        return self.get_window(*self.get_query_bounds(start_x, start_y, goal_x, goal_y, margin), collidables)
+
+    def reserve(self, size):
+        if len(self.visited) < size:
+            grow = size - len(self.visited)
+            self.g_score.extend(array("i", [0]) * grow)
+            self.came_from.extend(array("i", [0]) * grow)
+            self.visited.extend(array("i", [0]) * grow)
+
+    def get_planner(self, collidables):
+        key = frozenset(collidables)
+        planner = self.planners.get(key)
+        if planner is None:
+            planner = HierarchicalPlanner(self, key, self.cluster_size, self.cache_size)
+            self.planners[key] = planner
+        return planner
+
+    def on_tile_changed(self, tile_x, tile_y, old_tile, new_tile):
+        changed = False
+        for key in self.collidable_sets:
+            if (old_tile in key) == (new_tile in key):
+                continue
+            changed = True
+            if key in self.planners:
+                self.planners[key].on_tile_changed(tile_x, tile_y)
+        for field in list(self.goal_fields):
+            grid = field.grid
+            if (old_tile in grid.collidables) != (new_tile in grid.collidables) and grid.contains(tile_x, tile_y):
+                node = grid.get_node(tile_x, tile_y)
+                grid.cells[node] = 0 if new_tile in grid.collidables else 1
+                field.on_tile_changed(node)
+        if changed:
+            self.cache.clear()
+            self.version += 1
+            self.jump_stops = None
+
+    def get_search(self, strategy=None):
+        return self.jump_search if (strategy or self.strategy) == "jps" else self.search
+
+    def find_path(self, start_x, start_y, goal_x, goal_y, collidables, strategy=None):
+        # Returns the tiles to walk through, excluding the start and including the goal.
+        # strategy ("astar" or "jps", self.strategy when None) picks the tile search; queries at least
+        # hierarchical_distance apart are first planned over clusters with HPA*, then each segment
+        # is searched with the strategy as it is walked. Both strategies return paths of the same
+        # (shortest) length, so they share the cache
+        if not (0 <= start_x < self.width and 0 <= start_y < self.height and 0 <= goal_x < self.width and 0 <= goal_y < self.height):
+            return []
+        if self.is_hierarchical(start_x, start_y, goal_x, goal_y):
+            return self.get_planner(collidables).find_path(start_x, start_y, goal_x, goal_y, strategy)
+        return self.find_window_path(start_x, start_y, goal_x, goal_y, collidables, strategy)
+
+    def is_hierarchical(self, start_x, start_y, goal_x, goal_y):
+        return self.hierarchical_distance is not None and abs(goal_x - start_x) + abs(goal_y - start_y) >= self.hierarchical_distance
+
+    def find_window_path(self, start_x, start_y, goal_x, goal_y, collidables, strategy=None, margin=None):
+        # Flat search within the query window; routes leaving it are not found
+        key = (start_x, start_y, goal_x, goal_y, frozenset(collidables))
+        path = self.get_cached_path(key)
+        if path is None:
+            grid = self.get_query_window(start_x, start_y, goal_x, goal_y, key[4], margin)
+            path = tuple(self.get_search(strategy)(grid, grid.get_node(start_x, start_y), grid.get_node(goal_x, goal_y)))
+            self.cache_path(key, path)
+        return list(path)
+
+    def get_cached_path(self, key):
+        path = self.cache.get(key)
+        if path is not None:
+            self.cache.move_to_end(key)
+        return path
+
+    def track(self, field):
+        # Repairs the field whenever a tile of its window changes; dropped once the field is garbage collected
+        self.goal_fields.add(field)
+        return field
+
+    def cache_path(self, key, path):
+        self.cache[key] = path
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def search(self, grid, start, goal):
+        cells = grid.cells
+        if start == goal or not cells[goal]:
+            return []
+        width = grid.width
+        size = grid.size
+        self.reserve(size)
+        g_score = self.g_score
+        came_from = self.came_from
+        visited = self.visited
+        self.search_id += 1
+        search_id = self.search_id
+        goal_x, goal_y = goal % width, goal // width
+        visited[start] = search_id
+        g_score[start] = 0
+        # Heap entries pack f_score * size + node into a single int
+        open_set = [(abs(start % width - goal_x) + abs(start // width - goal_y)) * size + start]
+        while open_set:
+            entry = heapq.heappop(open_set)
+            node = entry % size
+            if node == goal:
+                path = []
+                while node != start:
+                    path.append(grid.get_tile(node))
+                    node = came_from[node]
+                return path[::-1]
+            x, y = node % width, node // width
+            tentative_g = g_score[node] + 1
+            if entry // size > tentative_g - 1 + abs(x - goal_x) + abs(y - goal_y):
+                continue  # Stale entry, the node was reached more cheaply since
+            for neighbor, neighbor_x, neighbor_y in (
+                (node - 1, x - 1, y) if x > 0 else (-1, 0, 0),
+                (node + 1, x + 1, y) if x < width - 1 else (-1, 0, 0),
+                (node - width, x, y - 1) if y > 0 else (-1, 0, 0),
+                (node + width, x, y + 1) if node + width < size else (-1, 0, 0),
+            ):
+                if neighbor < 0 or not cells[neighbor]:
+                    continue
+                if visited[neighbor] != search_id or tentative_g < g_score[neighbor]:
+                    visited[neighbor] = search_id
+                    g_score[neighbor] = tentative_g
+                    came_from[neighbor] = node
+                    heapq.heappush(open_set, (tentative_g + abs(neighbor_x - goal_x) + abs(neighbor_y - goal_y)) * size + neighbor)
+        return []  # No path found
+
+    def get_jump_stops(self, grid):
+        # Where horizontal scans stop, per direction: walls and tiles beside a wall corner
+        if self.jump_stops is None or self.jump_stops[0] is not grid:
+            walkable = np.frombuffer(grid.cells, dtype=np.uint8).reshape(grid.height, grid.width).astype(bool)
+            up = np.zeros_like(walkable)
+            down = np.zeros_like(walkable)
+            up[1:] = walkable[:-1]
+            down[:-1] = walkable[1:]
+            forced_right = np.zeros_like(walkable)
+            forced_left = np.zeros_like(walkable)
+            forced_right[:, 1:] = (up[:, 1:] & ~up[:, :-1]) | (down[:, 1:] & ~down[:, :-1])
+            forced_left[:, :-1] = (up[:, :-1] & ~up[:, 1:]) | (down[:, :-1] & ~down[:, 1:])
+            stops_left = bytearray((~walkable | forced_left).astype(np.uint8).tobytes())
+            stops_right = bytearray((~walkable | forced_right).astype(np.uint8).tobytes())
+            self.jump_stops = (grid, stops_left, stops_right)
+        return self.jump_stops
+
+    def jump_horizontal(self, grid, stops, node, dx, goal):
+        width = grid.width
+        row_start = node - node % width
+        if dx > 0:
+            stop = stops[2].find(1, node + 1, row_start + width)
+            if row_start <= goal < row_start + width and node < goal and (stop < 0 or goal <= stop):
+                return goal
+        else:
+            stop = stops[1].rfind(1, row_start, node)
+            if row_start <= goal < row_start + width and goal < node and goal >= stop:
+                return goal
+        if stop < 0 or not grid.cells[stop]:
+            return -1  # Ran into the window edge or a wall
+        return stop
+
+    def jump(self, grid, stops, x, y, dx, dy, goal):
+        # Scans from (x, y) in one direction; returns the first jump point or -1.
+        # 4-connected rules as in PathFinding.js: a horizontal scan stops next to a wall corner,
+        # a vertical scan also stops wherever a horizontal scan would find a jump point
+        width = grid.width
+        cells = grid.cells
+        if dx:
+            return self.jump_horizontal(grid, stops, y * width + x, dx, goal)
+        step = dy * width
+        y += dy
+        node = y * width + x
+        while 0 <= y < grid.height and cells[node]:
+            if node == goal:
+                return node
+            if (x > 0 and cells[node - 1] and not cells[node - 1 - step]) or \
+               (x < width - 1 and cells[node + 1] and not cells[node + 1 - step]):
+                return node
+            if self.jump_horizontal(grid, stops, node, 1, goal) >= 0 or self.jump_horizontal(grid, stops, node, -1, goal) >= 0:
+                return node
+            y += dy
+            node += step
+        return -1
+
+    def jump_search(self, grid, start, goal):
+        # Jump Point Search: same results as search() but only jump points enter the open set
+        if start == goal or not grid.cells[goal]:
+            return []
+        width = grid.width
+        size = grid.size
+        self.reserve(size)
+        g_score = self.g_score
+        came_from = self.came_from
+        visited = self.visited
+        self.search_id += 1
+        search_id = self.search_id
+        goal_x, goal_y = goal % width, goal // width
+        stops = self.get_jump_stops(grid)
+        visited[start] = search_id
+        g_score[start] = 0
+        open_set = [(abs(start % width - goal_x) + abs(start // width - goal_y)) * size + start]
+        while open_set:
+            entry = heapq.heappop(open_set)
+            node = entry % size
+            x, y = node % width, node // width
+            if node == goal:
+                # Expand the straight segments between jump points into single steps
+                path = []
+                while node != start:
+                    parent = came_from[node]
+                    step = 1 if parent // width == y else width
+                    if parent > node:
+                        step = -step
+                    while node != parent:
+                        path.append(grid.get_tile(node))
+                        node -= step
+                    x, y = node % width, node // width
+                return path[::-1]
+            g = g_score[node]
+            if entry // size > g + abs(x - goal_x) + abs(y - goal_y):
+                continue  # Stale entry
+            if node == start:
+                directions = ((-1, 0), (1, 0), (0, -1), (0, 1))
+            else:
+                parent = came_from[node]
+                if parent // width == y:
+                    directions = ((0, -1), (0, 1), (1 if node > parent else -1, 0))
+                else:
+                    directions = ((-1, 0), (1, 0), (0, 1 if node > parent else -1))
+            for dx, dy in directions:
+                jump_point = self.jump(grid, stops, x, y, dx, dy, goal)
+                if jump_point < 0:
+                    continue
+                jump_x, jump_y = jump_point % width, jump_point // width
+                tentative_g = g + abs(jump_x - x) + abs(jump_y - y)
+                if visited[jump_point] != search_id or tentative_g < g_score[jump_point]:
+                    visited[jump_point] = search_id
+                    g_score[jump_point] = tentative_g
+                    came_from[jump_point] = node
+                    heapq.heappush(open_set, (tentative_g + abs(jump_x - goal_x) + abs(jump_y - goal_y)) * size + jump_point)
+        return []  # No path found
+
+class HierarchicalPath:
+    # Path through abstract waypoints, refined to tiles one segment (about one chunk) at a time as it is read.
+    # Behaves as the list of every remaining tile: len() and iteration refine the whole path,
+    # while the truth test, path[0] and path.pop(0) only refine the segment being walked
+    def __init__(self, engine, collidables, start, waypoints, strategy=None):
+        self.engine = engine
+        self.collidables = collidables
+        self.strategy = strategy
+        self.position = start  # End of the refined steps
+        self.waypoints = list(waypoints)
+        self.steps = []  # Refined tiles not walked yet
+
+    def refine(self, count=None):
+        # Refines segments until `count` steps are known, or the whole path when None
+        while self.waypoints and (count is None or len(self.steps) < count):
+            waypoint = self.waypoints.pop(0)
+            # Consecutive waypoints share a cluster, so a window one cluster wide around them holds the segment
+            segment = self.engine.find_window_path(self.position[0], self.position[1], waypoint[0], waypoint[1],
+                                                   self.collidables, self.strategy, self.engine.cluster_size)
+            if not segment:
+                self.waypoints = []  # The route was cut since it was planned
+                return
+            self.steps.extend(segment)
+            self.position = waypoint
+
+    def __bool__(self):
+        self.refine(1)
+        return bool(self.steps)
+
+    def __len__(self):
+        self.refine()
+        return len(self.steps)
+
+    def __iter__(self):
+        index = 0
+        while True:
+            self.refine(index + 1)
+            if index >= len(self.steps):
+                return
+            yield self.steps[index]
+            index += 1
+
+    def get_extent(self, index):
+        # Steps to refine for an index or slice, None for all of them
+        if isinstance(index, slice):
+            if index.step is not None or (index.start or 0) < 0 or index.stop is None or index.stop < 0:
+                return None
+            return index.stop
+        return None if index < 0 else index + 1
+
+    def __getitem__(self, index):
+        self.refine(self.get_extent(index))
+        return self.steps[index]
+
+    def __delitem__(self, index):
+        self.refine(self.get_extent(index))
+        del self.steps[index]
+
+    def pop(self, index=-1):
+        self.refine(self.get_extent(index))
+        return self.steps.pop(index)
+
+class HierarchicalPlanner:
+    # HPA*: map split into clusters, entrances on the shared cluster borders, and cached
+    # distances between the entrances of each cluster form a small abstract graph.
+    # Clusters are read and their borders built when a search first reaches them.
+    # Abstract nodes are map-wide ids (y * map width + x)
+    def __init__(self, engine, collidables, cluster_size, cache_size=256):
+        self.engine = engine
+        self.collidables = collidables
+        self.cluster_size = cluster_size
+        self.clusters_x = -(-engine.width // cluster_size)
+        self.clusters_y = -(-engine.height // cluster_size)
+        self.grids = OrderedDict()  # Cluster -> GridWindow of the cluster and a one tile ring around it
+        self.borders = {}  # (cluster, neighbor cluster) -> list of (node, node across the border)
+        self.links = {}  # Entrance node -> set of entrance nodes across a border
+        self.intra = {}  # Cluster -> {entrance node: {entrance node: distance}}, built on first use
+        self.cache = OrderedDict()  # (start, goal) -> abstract waypoints
+        self.cache_size = cache_size
+
+    def get_cluster(self, node):
+        return (node % self.engine.width // self.cluster_size, node // self.engine.width // self.cluster_size)
+
+    def get_cluster_bounds(self, cluster):
+        start_x = cluster[0] * self.cluster_size
+        start_y = cluster[1] * self.cluster_size
+        return start_x, start_y, min(start_x + self.cluster_size, self.engine.width), min(start_y + self.cluster_size, self.engine.height)
+
+    def get_grid(self, cluster):
+        grid = self.grids.get(cluster)
+        if grid is None:
+            start_x, start_y, end_x, end_y = self.get_cluster_bounds(cluster)
+            grid = self.engine.get_window(start_x - 1, start_y - 1, end_x + 1, end_y + 1, self.collidables)
+            self.grids[cluster] = grid
+            if len(self.grids) > self.cache_size:
+                self.grids.popitem(last=False)
+        else:
+            self.grids.move_to_end(cluster)
+        return grid
+
+    def is_walkable(self, node):
+        width = self.engine.width
+        grid = self.get_grid(self.get_cluster(node))
+        return grid.cells[grid.get_node(node % width, node // width)]
+
+    def build_border(self, cluster, neighbor):
+        width = self.engine.width
+        grid = self.get_grid(cluster)
+        start_x, start_y, end_x, end_y = self.get_cluster_bounds(cluster)
+        if neighbor[0] > cluster[0]:
+            tiles = [(end_x - 1, y, end_x, y) for y in range(start_y, end_y)]
+        else:
+            tiles = [(x, end_y - 1, x, end_y) for x in range(start_x, end_x)]
+        # One entrance in the middle of each walkable run, or one at each end of long runs
+        transitions = []
+        run = []
+        for pair in tiles + [None]:
+            if pair is not None and grid.cells[grid.get_node(pair[0], pair[1])] and grid.cells[grid.get_node(pair[2], pair[3])]:
+                run.append((pair[1] * width + pair[0], pair[3] * width + pair[2]))
+                continue
+            if run:
+                transitions.extend([run[0], run[-1]] if len(run) >= 6 else [run[len(run) // 2]])
+                run = []
+        self.borders[(cluster, neighbor)] = transitions
+        for node, other in transitions:
+            self.links.setdefault(node, set()).add(other)
+            self.links.setdefault(other, set()).add(node)
+
+    def drop_border(self, cluster, neighbor):
+        for node, other in self.borders.pop((cluster, neighbor), ()):
+            self.links[node].discard(other)
+            self.links[other].discard(node)
+
+    def get_entrances(self, cluster):
+        entrances = set()
+        cluster_x, cluster_y = cluster
+        for key in (((cluster_x - 1, cluster_y), cluster), ((cluster_x, cluster_y - 1), cluster),
+                    (cluster, (cluster_x + 1, cluster_y)), (cluster, (cluster_x, cluster_y + 1))):
+            if min(key[0]) < 0 or key[1][0] >= self.clusters_x or key[1][1] >= self.clusters_y:
+                continue
+            if key not in self.borders:
+                self.build_border(*key)
+            for pair in self.borders[key]:
+                entrances.update(node for node in pair if self.get_cluster(node) == cluster)
+        return entrances
+
+    def get_cluster_distances(self, source, cluster):
+        # Breadth-first distances from source to every tile reachable without leaving the cluster,
+        # searched over the cluster's window and keyed by map-wide node ids
+        map_width = self.engine.width
+        start_x, start_y, end_x, end_y = self.get_cluster_bounds(cluster)
+        grid = self.get_grid(cluster)
+        cells = grid.cells
+        width = grid.width
+        # The cluster's tiles within its window
+        first_x, first_y = start_x - grid.start_x, start_y - grid.start_y
+        last_x, last_y = end_x - 1 - grid.start_x, end_y - 1 - grid.start_y
+        local = grid.get_node(source % map_width, source // map_width)
+        distances = {local: 0}
+        frontier = [local]
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for node in frontier:
+                x, y = node % width, node // width
+                for neighbor, inside in ((node - 1, x > first_x), (node + 1, x < last_x),
+                                         (node - width, y > first_y), (node + width, y < last_y)):
+                    if inside and cells[neighbor] and neighbor not in distances:
+                        distances[neighbor] = distance
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        offset = grid.start_y * map_width + grid.start_x
+        return {node // width * map_width + node % width + offset: distance for node, distance in distances.items()}
+
+    def get_intra(self, cluster):
+        intra = self.intra.get(cluster)
+        if intra is None:
+            entrances = self.get_entrances(cluster)
+            intra = {}
+            for entrance in entrances:
+                distances = self.get_cluster_distances(entrance, cluster)
+                intra[entrance] = {other: distances[other] for other in entrances if other != entrance and other in distances}
+            self.intra[cluster] = intra
+        return intra
+
+    def on_tile_changed(self, tile_x, tile_y):
+        # Forget the windows holding the tile and the borders and entrance distances around its cluster;
+        # they are rebuilt the next time a search reaches them
+        for cluster, grid in list(self.grids.items()):
+            if grid.contains(tile_x, tile_y):
+                del self.grids[cluster]
+        cluster = (tile_x // self.cluster_size, tile_y // self.cluster_size)
+        cluster_x, cluster_y = cluster
+        self.drop_border(cluster, (cluster_x + 1, cluster_y))
+        self.drop_border(cluster, (cluster_x, cluster_y + 1))
+        self.drop_border((cluster_x - 1, cluster_y), cluster)
+        self.drop_border((cluster_x, cluster_y - 1), cluster)
+        for affected in (cluster, (cluster_x - 1, cluster_y), (cluster_x + 1, cluster_y), (cluster_x, cluster_y - 1), (cluster_x, cluster_y + 1)):
+            self.intra.pop(affected, None)
+        self.cache.clear()
+
+    def find_path(self, start_x, start_y, goal_x, goal_y, strategy=None):
+        width = self.engine.width
+        start = start_y * width + start_x
+        goal = goal_y * width + goal_x
+        if start == goal or not self.is_walkable(goal):
+            return []
+        key = (start, goal)
+        waypoints = self.cache.get(key)
+        if waypoints is None:
+            waypoints = self.search(start, goal)
+            self.cache[key] = waypoints
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        if not waypoints:
+            return []
+        return HierarchicalPath(self.engine, self.collidables, (start_x, start_y), [(node % width, node // width) for node in waypoints], strategy)
+
+    def search(self, start, goal):
+        width = self.engine.width
+        goal_x, goal_y = goal % width, goal // width
+        start_cluster = self.get_cluster(start)
+        goal_cluster = self.get_cluster(goal)
+        # Temporary edges from the start and goal tiles to the entrances of their clusters
+        start_distances = self.get_cluster_distances(start, start_cluster)
+        start_edges = {entrance: start_distances[entrance] for entrance in self.get_entrances(start_cluster) if entrance in start_distances}
+        goal_distances = self.get_cluster_distances(goal, goal_cluster)
+        goal_edges = {entrance: goal_distances[entrance] for entrance in self.get_entrances(goal_cluster) if entrance in goal_distances}
+        g_score = {start: 0}
+        came_from = {}
+        open_set = [(abs(start % width - goal_x) + abs(start // width - goal_y), start)]
+        while open_set:
+            f, node = heapq.heappop(open_set)
+            if node == goal:
+                waypoints = []
+                while node != start:
+                    waypoints.append(node)
+                    node = came_from[node]
+                return tuple(waypoints[::-1])
+            g = g_score[node]
+            if f > g + abs(node % width - goal_x) + abs(node // width - goal_y):
+                continue
+            # A start tile that is itself an entrance keeps its own edges besides the temporary ones
+            edges = list(self.get_intra(self.get_cluster(node)).get(node, {}).items())
+            edges.extend((other, 1) for other in self.links.get(node, ()))
+            if node == start:
+                edges.extend(start_edges.items())
+            if node in goal_edges:
+                edges.append((goal, goal_edges[node]))
+            for neighbor, cost in edges:
+                tentative_g = g + cost
+                if tentative_g < g_score.get(neighbor, tentative_g + 1):
+                    g_score[neighbor] = tentative_g
+                    came_from[neighbor] = node
+                    heapq.heappush(open_set, (tentative_g + abs(neighbor % width - goal_x) + abs(neighbor // width - goal_y), neighbor))
+        return ()
+
+class GoalField:
+    # Incremental Dijkstra (LPA* without a heuristic) grown backward from one goal over a whole GridWindow.
+    # Every requester heading to the goal walks down its distances, and tile changes only repair the
+    # distances they affect. Nodes are local to the window
+    def __init__(self, grid, goal):
+        self.grid = grid
+        self.width = grid.width
+        self.cells = grid.cells
+        self.goal = goal
+        self.g = [math.inf] * grid.size
+        self.rhs = [math.inf] * grid.size
+        self.open_set = []  # (min(g, rhs), node) of inconsistent nodes; entries go stale once consistent
+        self.update_vertex(goal)
+        self.dirty = True
+
+    def get_neighbors(self, node):
+        x = node % self.width
+        neighbors = []
+        if x > 0:
+            neighbors.append(node - 1)
+        if x < self.width - 1:
+            neighbors.append(node + 1)
+        if node >= self.width:
+            neighbors.append(node - self.width)
+        if node + self.width < self.grid.size:
+            neighbors.append(node + self.width)
+        return neighbors
+
+    def update_vertex(self, node):
+        g, rhs = self.g, self.rhs
+        if node == self.goal:
+            rhs[node] = 0 if self.cells[node] else math.inf
+        else:
+            best = math.inf
+            if self.cells[node]:
+                for neighbor in self.get_neighbors(node):
+                    if self.cells[neighbor] and g[neighbor] + 1 < best:
+                        best = g[neighbor] + 1
+            rhs[node] = best
+        if g[node] != rhs[node]:
+            heapq.heappush(self.open_set, (min(g[node], rhs[node]), node))
+
+    def compute(self):
+        g, rhs, cells = self.g, self.rhs, self.cells
+        open_set = self.open_set
+        while open_set:
+            key, node = heapq.heappop(open_set)
+            if g[node] == rhs[node] or key != min(g[node], rhs[node]):
+                continue  # Stale entry
+            if g[node] > rhs[node]:
+                g[node] = rhs[node]
+                # Lowering g can only lower the neighbors' rhs
+                step = g[node] + 1
+                for neighbor in self.get_neighbors(node):
+                    if neighbor != self.goal and cells[neighbor] and step < rhs[neighbor]:
+                        rhs[neighbor] = step
+                        heapq.heappush(open_set, (min(g[neighbor], step), neighbor))
+            else:
+                g[node] = math.inf
+                self.update_vertex(node)
+                for neighbor in self.get_neighbors(node):
+                    self.update_vertex(neighbor)
+        self.dirty = False
+
+    def on_tile_changed(self, node):
+        self.update_vertex(node)
+        for neighbor in self.get_neighbors(node):
+            self.update_vertex(neighbor)
+        self.dirty = True
+
+    def get_next(self, node):
+        # Cheapest neighbor toward the goal, -1 when there is none
+        g = self.g
+        best = -1
+        best_cost = g[node]
+        for neighbor in self.get_neighbors(node):
+            if self.cells[neighbor] and g[neighbor] < best_cost:
+                best = neighbor
+                best_cost = g[neighbor]
+        return best
+
+class FieldPath:
+    # One requester's route down a GoalField, used like a list of the remaining tiles.
+    # Only the start node is its own, so any number of paths share the field's search
+    def __init__(self, field, start):
+        self.field = field
+        self.grid = field.grid
+        self.start = start
+
+    def move_to(self, node):
+        # Restarts the path from another tile of the window
+        self.start = node
+
+    def get_steps(self, count):
+        field = self.field
+        if field.dirty:
+            field.compute()
+        steps = []
+        node = self.start
+        while len(steps) < count and node != field.goal:
+            node = field.get_next(node)
+            if node < 0:
+                return []  # No route to the goal
+            steps.append(node)
+        return steps
+
+    def __bool__(self):
+        return bool(self.get_steps(1))
+
+    def __len__(self):
+        return len(self.get_steps(self.grid.size))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.step is not None or (index.start or 0) < 0 or (index.stop is not None and index.stop < 0):
+                raise IndexError("only forward slices of the path are supported")
+            steps = self.get_steps(self.grid.size if index.stop is None else index.stop)
+            return [self.grid.get_tile(node) for node in steps[index]]
+        steps = self.get_steps(index + 1)
+        if len(steps) <= index:
+            raise IndexError("path index out of range")
+        return self.grid.get_tile(steps[index])
+
+    def __delitem__(self, index):
+        # Only the walked steps can be dropped: del path[:count]
+        if not isinstance(index, slice) or index.start or index.step is not None or index.stop is None or index.stop < 0:
+            raise IndexError("only leading steps can be deleted")
+        if index.stop:
+            steps = self.get_steps(index.stop)
+            if steps:
+                self.start = steps[-1]
+
+    def pop(self, index=-1):
+        if index != 0:
+            raise IndexError("only the next step can be popped")
+        tile = self[0]
+        self.start = self.grid.get_node(*tile)
+        return tile
+
+worker_state = threading.local()
+
+def search_snapshot(engine, bounds, collidables, start, goal, strategy):
+    # Runs on a worker thread: reads the query window, then searches it with the thread's own scratch arrays
+    grid = engine.read_window(*bounds, collidables)
+    scratch = getattr(worker_state, "engine", None)
+    if scratch is None:
+        scratch = PathEngine(0, 0, None)
+        worker_state.engine = scratch
+    return tuple(scratch.get_search(strategy)(grid, grid.get_node(*start), grid.get_node(*goal)))
+
+def build_goal_field(engine, bounds, collidables, goal):
+    # Runs on a worker thread: reads the window and grows the field over all of it; tracked for tile changes on delivery
+    grid = engine.read_window(*bounds, collidables)
+    field = GoalField(grid, grid.get_node(*goal))
+    field.compute()
+    return field
+
+class PathService:
+    # Searches paths on worker threads, which also read the windows they search; results are delivered by poll().
+    # Incremental requests are grouped by goal: each (goal, collidables) gets one GoalField every requester shares
+    def __init__(self, engine, workers=1):
+        self.engine = engine
+        self.workers = workers
+        self.executor = None  # Started on the first request
+        self.pending = {}  # (start_x, start_y, goal_x, goal_y, collidables, False) -> (Future, engine version, window bounds)
+        self.building = {}  # (goal_x, goal_y, collidables) -> (Future, engine version, window bounds) of a GoalField
+        self.fields = weakref.WeakValueDictionary()  # (goal_x, goal_y, collidables) -> last GoalField built, while paths use it
+        self.waiting = {}  # (goal_x, goal_y, collidables) -> incremental request keys waiting for a field
+        self.requests = {}  # Requester -> request key
+        self.requesters = {}  # Request key -> requesters waiting for it
+        self.results = {}  # Requester -> delivered path
+
+    def get_executor(self):
+        if self.executor is None and self.workers > 0:
+            try:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pathfinding")
+            except RuntimeError as e:
+                print(f"Pathfinding falls back to the main thread: {e}")
+                self.workers = 0
+        return self.executor
+
+    def submit(self, key):
+        # The worker reads the window itself; without one the next poll() searches on the main thread
+        bounds = self.engine.get_query_bounds(*key[:4])
+        self.engine.register(key[4])
+        executor = self.get_executor()
+        future = None
+        if executor is not None:
+            future = executor.submit(search_snapshot, self.engine, bounds, key[4], key[:2], key[2:4], self.engine.strategy)
+        self.pending[key] = (future, self.engine.version, bounds)
+
+    def submit_field(self, field_key):
+        # One window spanning every waiting start and the field built before, so fields only ever grow
+        windows = [self.engine.get_query_bounds(key[0], key[1], field_key[0], field_key[1]) for key in self.waiting[field_key]]
+        field = self.fields.get(field_key)
+        if field is not None:
+            grid = field.grid
+            windows.append((grid.start_x, grid.start_y, grid.start_x + grid.width, grid.start_y + grid.height))
+        bounds = (min(window[0] for window in windows), min(window[1] for window in windows),
+                  max(window[2] for window in windows), max(window[3] for window in windows))
+        self.engine.register(field_key[2])
+        executor = self.get_executor()
+        future = None
+        if executor is not None:
+            future = executor.submit(build_goal_field, self.engine, bounds, field_key[2], field_key[:2])
+        self.building[field_key] = (future, self.engine.version, bounds)
+
+    def request(self, requester, start_x, start_y, goal_x, goal_y, collidables, incremental=False):
+        # Returns the path once it has been delivered and [] while it is being searched.
+        # Incremental requests return a FieldPath down the goal's shared GoalField, which stays valid when
+        # tiles change; a start inside a field already built gets its path right away.
+        # Other requests far enough apart for HPA* are planned here through engine.find_path,
+        # which only searches the abstract graph up front
+        path = self.results.pop(requester, None)
+        if path is not None:
+            # The requester kept moving while it waited; skip the steps it already walked past
+            if isinstance(path, FieldPath):
+                if path.grid.contains(start_x, start_y):
+                    path.move_to(path.grid.get_node(start_x, start_y))
+                    return path
+                path = None  # Wandered out of the field's window, ask again from here
+            else:
+                if (start_x, start_y) in path:
+                    path = path[path.index((start_x, start_y)) + 1:]
+                return path
+        if not (0 <= start_x < self.engine.width and 0 <= start_y < self.engine.height and 0 <= goal_x < self.engine.width and 0 <= goal_y < self.engine.height):
+            return []
+        key = (start_x, start_y, goal_x, goal_y, frozenset(collidables), incremental)
+        requested = self.requests.get(requester)
+        if requested is not None and requested[2:] == key[2:]:
+            return []  # Same destination already in flight
+        self.cancel(requester)
+        if incremental:
+            field = self.fields.get(key[2:5])
+            if field is not None and field.grid.contains(start_x, start_y):
+                return FieldPath(field, field.grid.get_node(start_x, start_y))
+        elif self.engine.is_hierarchical(start_x, start_y, goal_x, goal_y):
+            return self.engine.find_path(start_x, start_y, goal_x, goal_y, collidables)
+        else:
+            path = self.engine.get_cached_path(key[:5])
+            if path is not None:
+                return list(path)
+        if key not in self.requesters:
+            if incremental:
+                self.waiting.setdefault(key[2:5], set()).add(key)
+                if key[2:5] not in self.building:
+                    self.submit_field(key[2:5])
+            elif key not in self.pending:
+                self.submit(key)
+        self.requests[requester] = key
+        self.requesters.setdefault(key, []).append(requester)
+        return []
+
+    def is_pending(self, requester):
+        return requester in self.requests
+
+    def get_delivered(self):
+        # Requesters whose path has arrived and was not collected by request() yet
+        return list(self.results)
+
+    def cancel(self, requester):
+        key = self.requests.pop(requester, None)
+        self.results.pop(requester, None)
+        if key is None:
+            return
+        waiting = self.requesters[key]
+        waiting.remove(requester)
+        if waiting:
+            return
+        del self.requesters[key]
+        if key[5]:
+            field_key = key[2:5]
+            self.waiting[field_key].discard(key)
+            if self.waiting[field_key]:
+                return
+            del self.waiting[field_key]
+            future = self.building.pop(field_key)[0]
+        else:
+            future = self.pending.pop(key)[0]
+        if future is not None:
+            future.cancel()
+
+    def poll(self):
+        for key, (future, version, bounds) in list(self.pending.items()):
+            if future is None:
+                path = search_snapshot(self.engine, bounds, key[4], key[:2], key[2:4], self.engine.strategy)
+            elif future.done():
+                path = future.result()
+            else:
+                continue
+            del self.pending[key]
+            if version != self.engine.version:
+                self.submit(key)  # The map changed under the search
+                continue
+            self.engine.cache_path(key[:5], path)
+            for requester in self.requesters.pop(key, ()):
+                del self.requests[requester]
+                self.results[requester] = list(path)
+        for field_key, (future, version, bounds) in list(self.building.items()):
+            if future is None:
+                field = build_goal_field(self.engine, bounds, field_key[2], field_key[:2])
+            elif future.done():
+                field = future.result()
+            else:
+                continue
+            del self.building[field_key]
+            if version != self.engine.version:
+                self.submit_field(field_key)  # The map changed under the search
+                continue
+            self.fields[field_key] = self.engine.track(field)
+            waiting = self.waiting[field_key]
+            for key in [key for key in waiting if field.grid.contains(key[0], key[1])]:
+                waiting.discard(key)
+                start = field.grid.get_node(key[0], key[1])
+                for requester in self.requesters.pop(key):
+                    del self.requests[requester]
+                    self.results[requester] = FieldPath(field, start)
+            if waiting:
+                self.submit_field(field_key)  # Starts that asked while it was built lie outside its window
+            else:
+                del self.waiting[field_key]
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.pending.clear()
+        self.building.clear()
+        self.fields.clear()
+        self.waiting.clear()
+        self.requests.clear()
+        self.requesters.clear()
@@ -19,6 +19,9 @@ class PauseMenu:
                     return button["action"]
         return None
 
+    def get_regions(self, mouse_pos):
+        return [(button["rect"], button["rect"].collidepoint(mouse_pos)) for button in self.buttons]
+
     def draw(self):
         overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 180))
@@ -3,7 +3,8 @@ import pygame
 from quest import Quest, KillQuest
 from settings import TILE_SIZE, MAP_WIDTH, MAP_HEIGHT, INTERACTION_RANGE
 from inventory import Inventory
-from map import get_tile_at_position, collidable_tiles
+from map import collidable_tiles, get_collision_region
+from collision import move_box
 from time import sleep
 
 class Player:
@@ -32,7 +33,14 @@ class Player:
         self.interacting_npc = None
         self.quests = []
         
-    def handle_input(self, dt, npcs, enemies, hud):
+    def get_nearby(self, entities, group, entity_index):
+        # Entities within interaction range, nearest first when an index is available
+        if entity_index is not None:
+            return entity_index.query_radius(self.rect.center, INTERACTION_RANGE, group)
+        return [entity for entity in entities
+                if ((self.rect.centerx - entity.rect.centerx) ** 2 + (self.rect.centery - entity.rect.centery) ** 2) ** 0.5 < INTERACTION_RANGE]
+
+    def handle_input(self, dt, npcs, enemies, hud, entity_index=None):
         keys = pygame.key.get_pressed()
         if self.show_inventory or self.show_quest_log:
             return
@@ -78,24 +86,16 @@ class Player:
         speed = self.base_speed * self.sprint_multiplier if is_sprinting else self.base_speed
         if direction.length() > 0:
             direction.normalize_ip()
-            new_position = self.position + direction * speed * dt
-            new_rect = self.rect.copy()
-            new_rect.center = round(new_position.x), round(new_position.y)
-            corners = [
-                (new_rect.left + 2, new_rect.top + 2),
-                (new_rect.right - 2, new_rect.top + 2),
-                (new_rect.left + 2, new_rect.bottom - 2),
-                (new_rect.right - 2, new_rect.bottom - 2)
-            ]
-            collision = False
-            for corner_x, corner_y in corners:
-                tile = get_tile_at_position(corner_x, corner_y)
-                if tile in collidable_tiles:
-                    collision = True
-                    break
-            if not collision:
-                self.position = new_position
-                self.rect.center = round(self.position.x), round(self.position.y)
+            step = direction * speed * dt
+            # Only the tiles the box can sweep through this frame
+            reach_x = abs(step.x) + self.rect.width
+            reach_y = abs(step.y) + self.rect.height
+            walkable, origin = get_collision_region(int((self.position.x - reach_x) // TILE_SIZE), int((self.position.y - reach_y) // TILE_SIZE),
+                                                    int((self.position.x + reach_x) // TILE_SIZE) + 1, int((self.position.y + reach_y) // TILE_SIZE) + 1,
+                                                    collidable_tiles)
+            self.position.x, self.position.y = move_box(walkable, self.position.x, self.position.y,
+                                                        self.rect.width // 2 - 2, self.rect.height // 2 - 2, step.x, step.y, origin)
+            self.rect.center = round(self.position.x), round(self.position.y)
         # Update stamina
         if is_sprinting and direction.length() > 0:
             self.stamina = max(0, self.stamina - self.stamina_drain_rate * dt)
@@ -103,34 +103,31 @@ class Player:
             self.stamina = min(self.max_stamina, self.stamina + self.stamina_recovery_rate * dt)
         # Handle NPC interaction
         if keys[pygame.K_e]:
-            for npc in npcs:
-                distance = ((self.rect.centerx - npc.rect.centerx) ** 2 + (self.rect.centery - npc.rect.centery) ** 2) ** 0.5
-                if distance < INTERACTION_RANGE:
-                    if self.interacting_npc and self.interacting_npc != npc:
-                        self.interacting_npc = None
-                    self.interacting_npc = npc
-                    self.in_dialogue = True
-                    try:
-                        self.interaction_prompt = npc.interact(self)
-                        for quest in self.quests:
-                            if isinstance(quest, Quest) and quest.active:
-                                notification = quest.check_completion(self, npc, self.time_system)
-                                if notification:
-                                    hud.show_quest_modal(notification["name"], notification["description"], notification["status"])
-                    except Exception as e:
-                        print(f"Interaction error: {e}")
-                        self.in_dialogue = False
-                        self.interacting_npc = None
-                        self.interaction_prompt = {"text": "", "options": []}
-                    break
+            for npc in self.get_nearby(npcs, "npc", entity_index):
+                if self.interacting_npc and self.interacting_npc != npc:
+                    self.interacting_npc = None
+                self.interacting_npc = npc
+                self.in_dialogue = True
+                try:
+                    self.interaction_prompt = npc.interact(self)
+                    for quest in self.quests:
+                        if isinstance(quest, Quest) and quest.active:
+                            notification = quest.check_completion(self, npc, self.time_system)
+                            if notification:
+                                hud.show_quest_modal(notification["name"], notification["description"], notification["status"])
+                except Exception as e:
+                    print(f"Interaction error: {e}")
+                    self.in_dialogue = False
+                    self.interacting_npc = None
+                    self.interaction_prompt = {"text": "", "options": []}
+                break
             sleep(0.2)
         # Handle attack
         if self.attack_cooldown > 0:
             self.attack_cooldown -= dt
         if keys[pygame.K_SPACE] and self.attack_cooldown <= 0:
-            for enemy in enemies:
-                distance = ((self.rect.centerx - enemy.rect.centerx) ** 2 + (self.rect.centery - enemy.rect.centery) ** 2) ** 0.5
-                if distance < INTERACTION_RANGE and enemy.alive:
+            for enemy in self.get_nearby(enemies, "enemy", entity_index):
+                if enemy.alive:
                     enemy.take_damage(self.attack_damage)
                     self.attack_cooldown = self.attack_cooldown_duration
                     print(f"Attacked {enemy.name}, health: {enemy.health}")
@@ -140,9 +137,8 @@ class Player:
                             if notification:
                                 hud.show_quest_modal(notification["name"], notification["description"], notification["status"])
                     break
-            for npc in npcs:
-                distance = ((self.rect.centerx - npc.rect.centerx) ** 2 + (self.rect.centery - npc.rect.centery) ** 2) ** 0.5
-                if distance < INTERACTION_RANGE and npc.alive:
+            for npc in self.get_nearby(npcs, "npc", entity_index):
+                if npc.alive:
                     npc.take_damage(self.attack_damage)
                     self.attack_cooldown = self.attack_cooldown_duration
                     print(f"Attacked {npc.name}, health: {npc.health}")
@@ -164,8 +160,8 @@ class Player:
         self.rect.clamp_ip(pygame.Rect(0, 0, MAP_WIDTH, MAP_HEIGHT))
         self.position.x, self.position.y = self.rect.center
         
-    def update(self, dt, npcs, enemies, hud):
-        self.handle_input(dt, npcs, enemies, hud)
+    def update(self, dt, npcs, enemies, hud, entity_index=None):
+        self.handle_input(dt, npcs, enemies, hud, entity_index)
         
     def draw_health_bar(self, surface, camera):
         bar_width = 30
@@ -20,11 +20,7 @@ class Quest:
     def check_completion(self, player, npc, time_system):
         if self.active and not self.completed:
             if time_system.hour >= self.deadline_hour:
-                self.active = False
-                if self.npc:
-                    self.npc.quest_status = "failed"
-                    self.npc.reset_quest_state()
-                print(f"Quest '{self.name}' failed: Time expired.")
+                self.fail()
                 return self.notify("Quest Failed!")
             elif npc == self.target_npc and player.interaction_prompt["text"] == npc.interact(player)["text"]:
                 self.completed = True
@@ -37,11 +33,25 @@ class Quest:
                 return self.notify("Quest Completed!")
         return None
 
-    def start(self):
+    def start(self, time_system=None):
+        # With a time system the quest also fails on its own at the deadline, without waiting for a check
         self.active = True
+        if time_system:
+            time_system.schedule(self.deadline_hour, 0, self.expire)
         print(f"Quest '{self.name}' started: {self.description}")
         return self.notify("Quest Started!")
 
+    def expire(self, time_system):
+        if self.active and not self.completed:
+            self.fail()
+
+    def fail(self):
+        self.active = False
+        if self.npc:
+            self.npc.quest_status = "failed"
+            self.npc.reset_quest_state()
+        print(f"Quest '{self.name}' failed: Time expired.")
+
     def get_progress(self):
         if self.completed:
             return "Completed"
@@ -53,10 +63,10 @@ class Quest:
         return f"Deadline: {self.deadline_hour:02d}:00"
 
 class KillQuest:
-    def __init__(self, name, description, target_enemy, start_hour, end_hour, reward, npc=None):
+    def __init__(self, name, description, target_name, start_hour, end_hour, reward, npc=None):
         self.name = name
         self.description = description
-        self.target_enemy = target_enemy
+        self.target_name = target_name  # By name, since spawned enemies are recycled
         self.start_hour = start_hour
         self.end_hour = end_hour
         self.reward = reward
@@ -75,13 +85,9 @@ class KillQuest:
         if self.active and not self.completed:
             if not (self.start_hour <= time_system.hour < self.end_hour or 
                     (self.end_hour < self.start_hour and (time_system.hour >= self.start_hour or time_system.hour < self.end_hour))):
-                self.active = False
-                if self.npc:
-                    self.npc.quest_status = "failed"
-                    self.npc.reset_quest_state()
-                print(f"Quest '{self.name}' failed: Time window expired.")
+                self.fail()
                 return self.notify("Quest Failed!")
-            elif enemy == self.target_enemy and not enemy.alive:
+            elif enemy.name == self.target_name and not enemy.alive:
                 self.completed = True
                 self.active = False
                 player.inventory.add_item(self.reward)
@@ -92,17 +98,31 @@ class KillQuest:
                 return self.notify("Quest Completed!")
         return None
 
-    def start(self):
+    def start(self, time_system=None):
+        # With a time system the quest also fails on its own when its window closes
         self.active = True
+        if time_system:
+            time_system.schedule(self.end_hour, 0, self.expire)
         print(f"Quest '{self.name}' started: {self.description}")
         return self.notify("Quest Started!")
 
+    def expire(self, time_system):
+        if self.active and not self.completed:
+            self.fail()
+
+    def fail(self):
+        self.active = False
+        if self.npc:
+            self.npc.quest_status = "failed"
+            self.npc.reset_quest_state()
+        print(f"Quest '{self.name}' failed: Time window expired.")
+
     def get_progress(self):
         if self.completed:
             return "Completed"
         elif not self.active:
             return "Failed"
-        return f"Kill {self.target_enemy.name}: {'Yes' if not self.target_enemy.alive else 'No'}"
+        return f"Kill {self.target_name}: No"
 
     def get_time_info(self):
         return f"Time: {self.start_hour:02d}:00-{self.end_hour:02d}:00"
\ No newline at end of file
@@ -0,0 +1,70 @@
+# renderer.py
+import math
+import pygame
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, DIRTY_RECT_MAX_COVERAGE
+
+def merge_rects(rects):
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+class DirtyRectRenderer:
+    def __init__(self, screen):
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.camera_position = None
+        self.full_state = None
+        self.entity_states = {}  # id(entity) -> (screen rect, appearance)
+        self.region_states = {}  # region key -> value last drawn
+
+    def get_entity_state(self, entity, camera):
+        if not getattr(entity, "alive", True) or not getattr(entity, "visible", True):
+            return None
+        # Same whole-pixel camera offset as draw_map
+        rect = pygame.Rect(entity.rect.x - math.ceil(camera.x), entity.rect.y - math.ceil(camera.y), entity.rect.width, entity.rect.height)
+        # Health bar drawn above the sprite
+        rect.union_ip(pygame.Rect(rect.centerx - 15, rect.top - 10, 30, 8))
+        return rect.inflate(4, 4), entity.health
+
+    def render(self, draw_scene, camera, entities, full_state, regions, animating=False):
+        # full_state changes (pause, lighting, weather type) repaint everything, as does a frame where
+        # something covering the whole screen moves on its own (animating, e.g. weather particles);
+        # regions is a list of (rect, value) repainted when their value changes
+        camera_position = (math.ceil(camera.x), math.ceil(camera.y))
+        full = animating or camera_position != self.camera_position or full_state != self.full_state
+        self.camera_position = camera_position
+        self.full_state = full_state
+        dirty = []
+        entity_states = {}
+        for entity in entities:
+            state = self.get_entity_state(entity, camera)
+            entity_states[id(entity)] = state
+            previous = self.entity_states.get(id(entity))
+            if state != previous:
+                dirty.extend(entry[0] for entry in (state, previous) if entry)
+        self.entity_states = entity_states
+        for key, (rect, value) in enumerate(regions):
+            if self.region_states.get(key, (None, None)) != (rect, value):
+                self.region_states[key] = (rect, value)
+                dirty.append(rect)
+        dirty = [rect.clip(self.screen_rect) for rect in merge_rects(dirty)]
+        dirty = [rect for rect in dirty if rect.width and rect.height]
+        # The scene is drawn once, clipped to the box around every dirty area, so a partial frame never
+        # costs more scene passes than a full one; past a point the box costs as much as the whole screen
+        bounds = dirty[0].unionall(dirty[1:]) if dirty else None
+        if not full and bounds:
+            full = bounds.width * bounds.height > DIRTY_RECT_MAX_COVERAGE * SCREEN_WIDTH * SCREEN_HEIGHT
+        if full:
+            draw_scene()
+            pygame.display.flip()
+        elif dirty:
+            self.screen.set_clip(bounds)
+            draw_scene()
+            self.screen.set_clip(None)
+            pygame.display.update(dirty)
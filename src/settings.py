@@ -4,12 +4,36 @@
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
+SIMULATION_TICK_RATE = 60  # Fixed simulation steps per second, independent of the frame rate
+MAX_SIMULATION_STEPS = 5  # Steps run per frame at most; time beyond that is dropped after a hitch
+DIRTY_RECT_RENDERING = False  # Repaint and present only changed screen areas
+DIRTY_RECT_MAX_COVERAGE = 0.5  # Fraction of the screen the box around the dirty areas may cover before a full redraw is cheaper
 
 # Map settings
 TILE_SIZE = 32
-MAP_WIDTH = 100 * TILE_SIZE
-MAP_HEIGHT = 100 * TILE_SIZE
+MAP_TILES_X = 100
+MAP_TILES_Y = 100
+MAP_WIDTH = MAP_TILES_X * TILE_SIZE
+MAP_HEIGHT = MAP_TILES_Y * TILE_SIZE
 MINIMAP_SIZE = 200
+MAP_FILE = "world.map"  # Baked by bake_map.py into src/assets; procedural generation is used when missing
+
+# Chunk streaming settings
+CHUNK_SIZE = 25  # Tiles per chunk side
+CHUNK_LOAD_MARGIN = 1  # Chunks kept loaded around the camera view
+CHUNK_PREFETCH_DISTANCE = 2  # Chunks loaded ahead of the player's movement
+CHUNK_PREFETCH_PER_FRAME = 1  # Prefetched chunks generated and baked per frame
+CHUNK_MEMORY_BUDGET = 48 * 1024 * 1024  # Bytes of tile data and baked surfaces kept resident
+CHUNK_WORKERS = None  # Processes generating chunks in the background; None uses all cores but one, 0 the main thread
+WORLD_SEED = 0
+
+# Pathfinding settings
+PATH_CACHE_SIZE = 256  # Recent paths kept per (start, goal, collidables)
+HIERARCHICAL_PATH_DISTANCE = 40  # Manhattan distance from which paths are planned over chunks (HPA*), None to disable
+PATH_STRATEGY = "astar"  # "astar" or "jps" (Jump Point Search)
+PATH_WINDOW_MARGIN = CHUNK_SIZE  # Tiles searched around the box spanning a path's start and goal
+PATH_WORKERS = 1  # Background pathfinding threads, 0 to search on the main thread
+FLOW_FIELD_RADIUS = 24  # Tiles around the player covered by the chase flow field
 
 # Player settings
 PLAYER_SIZE = 16
@@ -17,7 +41,37 @@ PLAYER_SPEED = 200
 SPRINT_SPEED = 300
 INTERACTION_RANGE = 50
 
+# Entity settings
+ENEMY_DETECTION_RANGE = 200
+ENEMY_ARCHETYPE_FILE = "enemies.json"  # Enemy types and their stats, in src/assets
+ENEMY_SPAWN_FILE = "spawns.json"  # Enemy spawn zones and their time windows, in src/assets
+ENEMY_POOL_SIZE = 64  # Enemies preallocated by the batch; it grows past this when needed
+ENTITY_CELL_SIZE = 128  # Spatial hash cell size in pixels
+AI_LOD_NEAR_MARGIN = 128  # Pixels around the camera view where AI updates every frame
+AI_LOD_MID_MARGIN = 640  # Width of the ring beyond it updated every AI_LOD_MID_INTERVAL frames
+AI_LOD_MID_INTERVAL = 4
+AI_LOD_FAR_INTERVAL = 15  # Frames between coarse updates further out
+
 # Time settings
 DAYS_PER_MONTH = 30
 MONTHS_PER_YEAR = 12
 REAL_SECONDS_PER_GAME_DAY = 180 # or 10800
+SLEEP_HOURS = 8  # Hours skipped when the player sleeps (Z)
+
+# Weather settings
+WEATHER_DENSITY = 1.0  # Scales weather particle counts and spawn rates; 100 makes a storm of 20,000 raindrops
+
+# Lighting settings
+# Day/night keyframes (hour, darkness alpha, tint the darkness fades toward); minutes in between are interpolated, wrapping at midnight
+LIGHTING_KEYFRAMES = [
+    (0, 200, (20, 30, 80)),  # Night
+    (4, 200, (20, 30, 80)),
+    (6, 70, (255, 120, 60)),  # Dawn
+    (7, 0, (255, 255, 255)),  # Morning: full brightness
+    (12, 0, (255, 255, 255)),
+    (13, 50, (120, 100, 60)),  # Afternoon: slight dim
+    (18, 50, (120, 100, 60)),
+    (19, 100, (200, 80, 30)),  # Dusk
+    (21, 150, (60, 40, 110)),  # Evening
+    (22, 200, (20, 30, 80)),
+]
@@ -0,0 +1,67 @@
+# spatial_hash.py
+import pygame
+
+class SpatialHash:
+    # Uniform grid over entity rects; each entity is listed in every cell its rect overlaps
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell_x, cell_y) -> set of entities
+        self.entities = {}  # Entity -> (group, cell range (start_x, start_y, end_x, end_y))
+
+    def get_cell_range(self, rect):
+        return (rect.left // self.cell_size, rect.top // self.cell_size,
+                (rect.right - 1) // self.cell_size, (rect.bottom - 1) // self.cell_size)
+
+    def add_to_cells(self, entity, cell_range):
+        for cell_y in range(cell_range[1], cell_range[3] + 1):
+            for cell_x in range(cell_range[0], cell_range[2] + 1):
+                self.cells.setdefault((cell_x, cell_y), set()).add(entity)
+
+    def remove_from_cells(self, entity, cell_range):
+        for cell_y in range(cell_range[1], cell_range[3] + 1):
+            for cell_x in range(cell_range[0], cell_range[2] + 1):
+                cell = self.cells[(cell_x, cell_y)]
+                cell.discard(entity)
+                if not cell:
+                    del self.cells[(cell_x, cell_y)]
+
+    def insert(self, entity, group=None):
+        if entity in self.entities:
+            self.remove(entity)
+        cell_range = self.get_cell_range(entity.rect)
+        self.entities[entity] = (group, cell_range)
+        self.add_to_cells(entity, cell_range)
+
+    def remove(self, entity):
+        group, cell_range = self.entities.pop(entity)
+        self.remove_from_cells(entity, cell_range)
+
+    def update(self, entity):
+        # Call after the entity moved; only touches the cells when it crossed a cell border
+        group, cell_range = self.entities[entity]
+        new_range = self.get_cell_range(entity.rect)
+        if new_range != cell_range:
+            self.remove_from_cells(entity, cell_range)
+            self.add_to_cells(entity, new_range)
+            self.entities[entity] = (group, new_range)
+
+    def query_rect(self, rect, group=None):
+        found = set()
+        start_x, start_y, end_x, end_y = self.get_cell_range(rect)
+        for cell_y in range(start_y, end_y + 1):
+            for cell_x in range(start_x, end_x + 1):
+                found.update(self.cells.get((cell_x, cell_y), ()))
+        return [entity for entity in found
+                if (group is None or self.entities[entity][0] == group) and entity.rect.colliderect(rect)]
+
+    def query_radius(self, position, radius, group=None):
+        # Entities whose centers lie within radius of position, nearest first
+        x, y = position
+        bounds = pygame.Rect(int(x - radius), int(y - radius), int(radius * 2) + 2, int(radius * 2) + 2)
+        nearby = []
+        for entity in self.query_rect(bounds, group):
+            distance_sq = (entity.rect.centerx - x) ** 2 + (entity.rect.centery - y) ** 2
+            if distance_sq < radius * radius:
+                nearby.append((distance_sq, entity))
+        nearby.sort(key=lambda item: item[0])
+        return [entity for distance_sq, entity in nearby]
@@ -0,0 +1,105 @@
+# spawner.py
+import json
+import os
+import random
+from settings import TILE_SIZE, ENEMY_SPAWN_FILE
+from archetypes import get_hour_mask
+
+DEFAULT_SPAWN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", ENEMY_SPAWN_FILE)
+
+class SpawnZone:
+    # Keeps `count` enemies of one archetype around a tile while its time window is open
+    __slots__ = ("name", "archetype", "tile", "radius", "count", "village_tile", "hours", "respawn", "open", "enemies", "killed")
+
+    def __init__(self, data, archetypes):
+        self.name = data["name"]
+        self.archetype = archetypes[data["archetype"]]
+        self.tile = tuple(data["tile"])
+        self.radius = data.get("radius", 0)  # Tiles around `tile` where enemies may appear
+        self.count = data.get("count", 1)
+        self.village_tile = tuple(data["village_tile"])
+        # Window defaults to the archetype's active hours
+        self.hours = get_hour_mask(data["hours"]) if "hours" in data else self.archetype.active_hours
+        self.respawn = data.get("respawn", False)  # Refill killed slots each time the window opens
+        self.open = False
+        self.enemies = [None] * self.count  # Slot -> active enemy
+        self.killed = [False] * self.count
+
+    def get_enemy_name(self, slot):
+        return self.name if self.count == 1 else f"{self.name}{slot + 1}"
+
+def load_zones(path, archetypes):
+    with open(path) as file:
+        return [SpawnZone(data, archetypes) for data in json.load(file)]
+
+class Spawner:
+    # Spawns enemies from the batch pool when a zone's window opens and releases them when it closes or they die;
+    # zones are only revisited on the hour
+    def __init__(self, batch, zones, time_system, walkable):
+        self.batch = batch
+        self.zones = zones
+        self.time_system = time_system
+        self.walkable = walkable  # (start_x, start_y, end_x, end_y) -> ([y, x] grid nonzero where walkable, its first tile)
+        self.owners = {}  # Enemy -> (zone, slot)
+        self.spawned = []  # Changes since the last update
+        self.released = []
+        time_system.subscribe("hour", self.on_hour)
+        self.on_hour(time_system)
+
+    def get_spawn_position(self, zone):
+        tile_x, tile_y = zone.tile
+        if zone.radius:
+            walkable, (start_x, start_y) = self.walkable(tile_x - zone.radius, tile_y - zone.radius, tile_x + zone.radius + 1, tile_y + zone.radius + 1)
+            height, width = walkable.shape
+            for _ in range(10):
+                x = tile_x + random.randint(-zone.radius, zone.radius)
+                y = tile_y + random.randint(-zone.radius, zone.radius)
+                if 0 <= x - start_x < width and 0 <= y - start_y < height and walkable[y - start_y, x - start_x]:
+                    tile_x, tile_y = x, y
+                    break
+        return tile_x * TILE_SIZE, tile_y * TILE_SIZE
+
+    def spawn(self, zone, slot):
+        x, y = self.get_spawn_position(zone)
+        village_position = (zone.village_tile[0] * TILE_SIZE, zone.village_tile[1] * TILE_SIZE)
+        enemy = self.batch.spawn(x, y, zone.get_enemy_name(slot), village_position, self.time_system, zone.archetype.name)
+        zone.enemies[slot] = enemy
+        self.owners[enemy] = (zone, slot)
+        return enemy
+
+    def release(self, enemy):
+        zone, slot = self.owners.pop(enemy)
+        zone.enemies[slot] = None
+        self.batch.release(enemy)
+        # Enemies spawned and released between two updates were never seen by the caller
+        if enemy in self.spawned:
+            self.spawned.remove(enemy)
+        else:
+            self.released.append(enemy)
+
+    def update(self):
+        # Returns the (spawned, released) enemies since the last call so callers can keep their indexes in sync
+        for enemy in self.batch.collect_killed():
+            if enemy in self.owners:
+                zone, slot = self.owners[enemy]
+                zone.killed[slot] = True
+                self.release(enemy)
+        spawned, released = self.spawned, self.released
+        self.spawned = []
+        self.released = []
+        return spawned, released
+
+    def on_hour(self, time_system):
+        hour = time_system.hour
+        for zone in self.zones:
+            is_open = zone.hours >> hour & 1 == 1
+            if is_open and not zone.open and zone.respawn:
+                zone.killed = [False] * zone.count
+            zone.open = is_open
+            for slot in range(zone.count):
+                enemy = zone.enemies[slot]
+                if is_open and enemy is None and not zone.killed[slot]:
+                    self.spawned.append(self.spawn(zone, slot))
+                elif not is_open and enemy is not None:
+                    print(f"{enemy.name} despawned at {hour}:00")
+                    self.release(enemy)
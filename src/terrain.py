@@ -0,0 +1,144 @@
+# terrain.py
+from collections import OrderedDict
+import numpy as np
+
+def label_components(mask):
+    # 4-connected component labels of a boolean [y, x] mask, -1 outside it.
+    # Horizontal runs are labelled per row, then runs touching the row above are merged
+    starts = mask.copy()
+    starts[:, 1:] &= ~mask[:, :-1]
+    run_ids = np.cumsum(starts.ravel()).reshape(mask.shape) - 1
+    run_count = int(starts.sum())
+    labels = np.full(mask.shape, -1, dtype=np.int32)
+    if not run_count:
+        return labels
+    roots = np.arange(run_count, dtype=np.int64)
+    touching = mask[1:] & mask[:-1]
+    if touching.any():
+        # Each touching pair of runs once, packed into one int64 so deduplicating is a flat sort
+        pairs = np.unique(run_ids[1:][touching].astype(np.int64) * run_count + run_ids[:-1][touching])
+        runs, others = pairs // run_count, pairs % run_count
+        # Hook the larger root of every joined pair onto the smaller one, then flatten the trees,
+        # until each pair shares a root; pointers only ever decrease, so no cycles form
+        while True:
+            run_roots, other_roots = roots[runs], roots[others]
+            differ = run_roots != other_roots
+            if not differ.any():
+                break
+            run_roots, other_roots = run_roots[differ], other_roots[differ]
+            np.minimum.at(roots, np.maximum(run_roots, other_roots), np.minimum(run_roots, other_roots))
+            while True:
+                jumped = roots[roots]
+                if np.array_equal(jumped, roots):
+                    break
+                roots = jumped
+    labels[mask] = roots[run_ids[mask]]
+    return labels
+
+class TerrainWindow:
+    # Connectivity per passability class and the crossing tiles of one rectangle of the map;
+    # labels are only comparable within the same window
+    def __init__(self, bounds, tiles, collidables, water_tiles):
+        self.bounds = bounds  # (start_x, start_y, end_x, end_y) in tiles
+        walkable = ~np.isin(tiles, list(collidables))
+        water = np.isin(tiles, list(water_tiles))
+        dry = walkable & ~water
+        # Crossings are dry tiles with water on opposite sides (bridges, fords)
+        water_left = np.zeros_like(water)
+        water_right = np.zeros_like(water)
+        water_up = np.zeros_like(water)
+        water_down = np.zeros_like(water)
+        water_left[:, 1:] = water[:, :-1]
+        water_right[:, :-1] = water[:, 1:]
+        water_up[1:] = water[:-1]
+        water_down[:-1] = water[1:]
+        crossing = dry & ((water_left & water_right) | (water_up & water_down))
+        # "bank" is dry land with the crossings removed, so the two sides of a river fall apart
+        self.labels = {
+            "walkable": label_components(walkable),
+            "dry": label_components(dry),
+            "bank": label_components(dry & ~crossing),
+        }
+        crossing_ys, crossing_xs = np.nonzero(crossing)
+        self.crossing_xs = crossing_xs + bounds[0]
+        self.crossing_ys = crossing_ys + bounds[1]
+        self.crossing_labels = self.labels["dry"][crossing_ys, crossing_xs]
+
+    def contains(self, tile_x, tile_y):
+        start_x, start_y, end_x, end_y = self.bounds
+        return start_x <= tile_x < end_x and start_y <= tile_y < end_y
+
+    def get_label(self, passability, tile_x, tile_y):
+        if not self.contains(tile_x, tile_y):
+            return -1
+        return self.labels[passability].item(tile_y - self.bounds[1], tile_x - self.bounds[0])
+
+class TerrainIndex:
+    # Labels chunk-aligned windows around each query on demand, so no query costs more than the
+    # area it spans and a tile change only drops the cached windows that contain it.
+    # Connections leaving a window are not seen: such points count as unconnected
+    def __init__(self, width, height, load_region, collidables, water_tiles, chunk_size, margin_chunks=1, cache_size=32):
+        self.width = width
+        self.height = height
+        self.load_region = load_region  # (start_x, start_y, end_x, end_y) -> uint8 tiles [y, x], clipped to the map
+        self.collidables = collidables
+        self.water_tiles = water_tiles
+        self.chunk_size = chunk_size
+        self.margin_chunks = margin_chunks  # Chunks added around the query's own chunks
+        self.windows = OrderedDict()  # Bounds -> TerrainWindow, least recently used first
+        self.cache_size = cache_size
+
+    def on_tile_changed(self, tile_x, tile_y, old_tile, new_tile):
+        for bounds, window in list(self.windows.items()):
+            if window.contains(tile_x, tile_y):
+                del self.windows[bounds]
+
+    def get_window(self, start_x, start_y, goal_x, goal_y):
+        size = self.chunk_size
+        bounds = (max(0, (min(start_x, goal_x) // size - self.margin_chunks) * size),
+                  max(0, (min(start_y, goal_y) // size - self.margin_chunks) * size),
+                  min(self.width, (max(start_x, goal_x) // size + 1 + self.margin_chunks) * size),
+                  min(self.height, (max(start_y, goal_y) // size + 1 + self.margin_chunks) * size))
+        window = self.windows.get(bounds)
+        if window is None:
+            window = TerrainWindow(bounds, self.load_region(*bounds), self.collidables, self.water_tiles)
+            self.windows[bounds] = window
+            if len(self.windows) > self.cache_size:
+                self.windows.popitem(last=False)
+        else:
+            self.windows.move_to_end(bounds)
+        return window
+
+    def is_inside(self, tile_x, tile_y):
+        return 0 <= tile_x < self.width and 0 <= tile_y < self.height
+
+    def is_reachable(self, start_x, start_y, goal_x, goal_y, passability="walkable"):
+        if not (self.is_inside(start_x, start_y) and self.is_inside(goal_x, goal_y)):
+            return False
+        window = self.get_window(start_x, start_y, goal_x, goal_y)
+        label = window.get_label(passability, start_x, start_y)
+        return label >= 0 and label == window.get_label(passability, goal_x, goal_y)
+
+    def needs_crossing(self, start_x, start_y, goal_x, goal_y):
+        # Both points on dry land, on banks joined only through a crossing
+        if not self.is_reachable(start_x, start_y, goal_x, goal_y, "dry"):
+            return False
+        window = self.get_window(start_x, start_y, goal_x, goal_y)
+        start_bank = window.get_label("bank", start_x, start_y)
+        goal_bank = window.get_label("bank", goal_x, goal_y)
+        return start_bank >= 0 and goal_bank >= 0 and start_bank != goal_bank
+
+    def find_nearest_crossing(self, tile_x, tile_y, goal_x=None, goal_y=None):
+        # Closest crossing on the same dry land, within the window around the tile (and the goal, if given)
+        if not self.is_inside(tile_x, tile_y):
+            return None
+        if goal_x is None:
+            goal_x, goal_y = tile_x, tile_y
+        window = self.get_window(tile_x, tile_y, goal_x, goal_y)
+        label = window.get_label("dry", tile_x, tile_y)
+        candidates = np.flatnonzero(window.crossing_labels == label)
+        if label < 0 or not len(candidates):
+            return None
+        distances = (window.crossing_xs[candidates] - tile_x) ** 2 + (window.crossing_ys[candidates] - tile_y) ** 2
+        nearest = candidates[np.argmin(distances)]
+        return (window.crossing_xs[nearest].item(), window.crossing_ys[nearest].item())
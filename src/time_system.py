@@ -1,5 +1,10 @@
 # time_system.py
-from settings import REAL_SECONDS_PER_GAME_DAY
+import heapq
+import itertools
+from settings import REAL_SECONDS_PER_GAME_DAY, DAYS_PER_MONTH, MONTHS_PER_YEAR
+from lighting import lighting_table
+
+TIME_EVENTS = ("minute", "hour", "day", "month", "skip")  # "skip" follows a skip, for systems to settle
 
 class TimeSystem:
     def __init__(self):
@@ -11,56 +16,95 @@ class TimeSystem:
         self.seconds_accumulated = 0.0
         self.real_seconds_per_game_day = REAL_SECONDS_PER_GAME_DAY
         self.game_seconds_per_real_second = (24 * 3600) / self.real_seconds_per_game_day
+        self.listeners = {event: [] for event in TIME_EVENTS}  # Event -> [(priority, order, callback)], lowest priority first
+        self.scheduled = []  # Heap of [total minutes, order, callback, daily]; cancelled entries have no callback
+        self.order = itertools.count()
 
     def set_time_scale(self, real_seconds_per_game_day):
         self.real_seconds_per_game_day = real_seconds_per_game_day
         self.game_seconds_per_real_second = (24 * 3600) / self.real_seconds_per_game_day
         
+    def subscribe(self, event, callback, priority=0):
+        # callback(time_system) runs on every transition of `event`; lower priorities run first
+        listeners = self.listeners[event]
+        listeners.append((priority, next(self.order), callback))
+        listeners.sort(key=lambda listener: listener[:2])
+
+    def unsubscribe(self, event, callback):
+        self.listeners[event] = [listener for listener in self.listeners[event] if listener[2] != callback]
+
+    def get_total_minutes(self):
+        days = ((self.year - 1) * MONTHS_PER_YEAR + self.month - 1) * DAYS_PER_MONTH + self.day - 1
+        return (days * 24 + self.hour) * 60 + self.minute
+
+    def schedule(self, hour, minute, callback, daily=False):
+        # callback(time_system) runs the next time the clock reads hour:minute (tomorrow if that is now or past),
+        # then every day at that time when daily. Returns a handle for cancel
+        now = self.get_total_minutes()
+        due = now - (self.hour * 60 + self.minute) + hour * 60 + minute
+        if due <= now:
+            due += 24 * 60
+        entry = [due, next(self.order), callback, daily]
+        heapq.heappush(self.scheduled, entry)
+        return entry
+
+    def cancel(self, handle):
+        handle[2] = None
+
+    def emit(self, event):
+        for priority, order, callback in list(self.listeners[event]):
+            callback(self)
+
+    def advance_minute(self):
+        # One minute forward; events fire finest first, once the whole clock has moved on
+        self.minute += 1
+        events = ["minute"]
+        if self.minute == 60:
+            self.minute = 0
+            self.hour += 1
+            events.append("hour")
+            if self.hour == 24:
+                self.hour = 0
+                self.day += 1
+                events.append("day")
+                if self.day > DAYS_PER_MONTH:
+                    self.day = 1
+                    self.month += 1
+                    events.append("month")
+                    if self.month > MONTHS_PER_YEAR:
+                        self.month = 1
+                        self.year += 1
+        for event in events:
+            self.emit(event)
+        now = self.get_total_minutes()
+        while self.scheduled and self.scheduled[0][0] <= now:
+            entry = heapq.heappop(self.scheduled)
+            callback = entry[2]
+            if callback is None:
+                continue
+            if entry[3]:
+                entry[0] += 24 * 60
+                heapq.heappush(self.scheduled, entry)
+            callback(self)
+
+    def skip(self, minutes):
+        # Jumps ahead without simulating frames: every transition and scheduled callback still fires in order
+        for _ in range(minutes):
+            self.advance_minute()
+        self.seconds_accumulated = 0.0
+        self.emit("skip")
+
     def update(self, dt):
         self.seconds_accumulated += dt
         game_seconds = self.seconds_accumulated * self.game_seconds_per_real_second
         new_minutes = int(game_seconds // 60)
         self.seconds_accumulated -= (new_minutes * 60) / self.game_seconds_per_real_second
-        self.minute += new_minutes
-        # Roll over minutes
-        while self.minute >= 60:
-            self.minute -= 60
-            self.hour += 1
-        # Roll over hours
-        while self.hour >= 24:
-            self.hour -= 24
-            self.day += 1
-        # Roll over days
-        while self.day > 30:  # 30 days per month
-            self.day -= 30
-            self.month += 1
-        # Roll over months
-        while self.month > 12:  # 12 months per year
-            self.month -= 12
-            self.year += 1
+        for _ in range(new_minutes):
+            self.advance_minute()
 
     def get_time_string(self):
         return f"{self.day}/{self.month}/{self.year} - {self.hour:02d}:{self.minute:02d}"
 
-    def get_lighting_alpha(self):
-        hour = self.hour + self.minute / 60.0
-        if 6 <= self.hour < 12:
-            return 0  # Morning: Full brightness
-        elif 12 <= hour < 13:
-            return 50 * (hour - 12) # Noon: Brightest
-        elif 12 <= hour < 18:
-            return 50  # Afternoon: Slight dim
-        elif 18 <= hour < 19:
-            return 50 + 50 * (hour - 18) # Evening: Dimming
-        elif 19 <= hour < 21:
-            return 100 # Evening: Dimming more
-        elif 21 <= hour < 22:
-            return 100 + 50 * (hour - 21)  # Evening: Darker
-        elif 22 <= hour < 24:
-            return 150 * (hour - 22) # Night: Darkening
-        elif 0 <= hour < 3:
-            return 150 + 50 * (hour - 0) # Night: Darkening more
-        elif 3 <= hour < 6:
-            return 150 + 50 * (hour - 3) # Night: Darkening more    
-        else:
-            return 0  # Invalid hour, return full brightness
\ No newline at end of file
+    def get_lighting_color(self):
+        # Multiply colour of the day/night overlay, (255, 255, 255) in full daylight
+        return tuple(int(channel) for channel in lighting_table[self.hour * 60 + self.minute, 1:])
@@ -1,22 +1,52 @@
 # weather.py
 import pygame
-import random
-from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from particles import ParticleBatch
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, WEATHER_DENSITY
+
+# Per weather type: pool size, spawns per second, spawn ranges (low, high), lifetime in seconds, sideways jitter
+# and the bounds (left, top, right, bottom) a particle dies outside of; counts and rates scale with WEATHER_DENSITY
+WEATHER_PARTICLES = {
+    "rain": {"count": 200, "rate": 180, "x": (0, SCREEN_WIDTH), "y": (0, 0), "vx": (0, 0), "vy": (200, 300),
+             "life": 4.0, "jitter": 0, "bounds": (float("-inf"), float("-inf"), float("inf"), SCREEN_HEIGHT)},
+    "snow": {"count": 100, "rate": 120, "x": (0, SCREEN_WIDTH), "y": (0, 0), "vx": (0, 0), "vy": (50, 100),
+             "life": 15.0, "jitter": 10, "bounds": (float("-inf"), float("-inf"), float("inf"), SCREEN_HEIGHT)},
+    "fog": {"count": 50, "rate": 60, "x": (0, 0), "y": (0, SCREEN_HEIGHT), "vx": (20, 50), "vy": (0, 0),
+            "life": 90.0, "jitter": 0, "bounds": (0, float("-inf"), SCREEN_WIDTH * 2, float("inf"))},
+}
+
+def create_particle_sprite(weather_type):
+    # Returns the sprite and its offset from the particle position
+    if weather_type == "rain":
+        sprite = pygame.Surface((1, 6), pygame.SRCALPHA)
+        sprite.fill((0, 150, 255, 50))
+        return sprite, (0, 0)
+    if weather_type == "snow":
+        sprite = pygame.Surface((5, 5), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (255, 255, 255, 40), (2, 2), 2)
+        return sprite, (-2, -2)
+    sprite = pygame.Surface((50, 20), pygame.SRCALPHA)
+    sprite.fill((150, 150, 150, 30))
+    return sprite, (0, 0)
 
 class WeatherSystem:
     def __init__(self, time_system):
         self.time_system = time_system
         self.weather_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        self.rain_particles = []
-        self.snow_particles = []
-        self.fog_particles = []
+        self.particles = {}  # Weather type -> ParticleBatch
+        self.spawn_budget = {}  # Weather type -> fractional particles owed to the spawn rate
+        for weather_type, config in WEATHER_PARTICLES.items():
+            sprite, offset = create_particle_sprite(weather_type)
+            self.particles[weather_type] = ParticleBatch(max(1, int(config["count"] * WEATHER_DENSITY)), sprite, offset)
+            self.spawn_budget[weather_type] = 0.0
         self.weather_type = "clear"  # clear, rain, snow, fog
         self.weather_alpha = 0  # Current alpha (0–100)
         self.target_alpha = 0  # Target alpha for fade
         self.fade_duration = 10.0  # Fade over 10 seconds
         self.fade_timer = 0
-        self.max_particles = {"rain": 200, "snow": 100, "fog": 50}
         self.is_fading_out = False  # Track fade-out state
+        time_system.subscribe("hour", self.on_hour)
+        time_system.subscribe("skip", self.on_skip)
+        self.on_hour(time_system)
 
     def get_weather_for_hour(self, hour):
         if hour in [21, 22, 23, 3, 4, 5]:
@@ -27,9 +57,8 @@ class WeatherSystem:
             return "fog"
         return "clear"
     
-    def update(self, dt):
-        hour = self.time_system.hour
-        new_weather = self.get_weather_for_hour(hour)
+    def on_hour(self, time_system):
+        new_weather = self.get_weather_for_hour(time_system.hour)
 
         # Handle weather transition
         if new_weather != self.weather_type:
@@ -42,10 +71,27 @@ class WeatherSystem:
                 pass
             else:
                 # Clear particles for new weather type
-                self.rain_particles = []
-                self.snow_particles = []
-                self.fog_particles = []
+                self.clear_particles()
 
+    def on_skip(self, time_system):
+        # Skip straight to the end of any fade, and drop the particles left from before the skip
+        self.fade_timer = self.fade_duration
+        self.weather_alpha = self.target_alpha
+        self.is_fading_out = False
+        self.clear_particles()
+        if self.weather_type in self.particles:
+            # Resume the current weather already settled, with the particles of one lifetime of spawning
+            config = WEATHER_PARTICLES[self.weather_type]
+            self.particles[self.weather_type].seed(int(config["rate"] * WEATHER_DENSITY * config["life"]), config["x"], config["y"],
+                                                   config["vx"], config["vy"], config["life"], config["bounds"])
+
+    def clear_particles(self):
+        for particles in self.particles.values():
+            particles.clear()
+        for weather_type in self.spawn_budget:
+            self.spawn_budget[weather_type] = 0.0
+
+    def update(self, dt):
         # Update fade
         if self.fade_timer < self.fade_duration:
             self.fade_timer += dt
@@ -60,44 +106,29 @@ class WeatherSystem:
             self.weather_alpha = self.target_alpha
             self.is_fading_out = False
 
-        # Clear off-screen particles
-        self.rain_particles = [p for p in self.rain_particles if p[1] < SCREEN_HEIGHT]
-        self.snow_particles = [p for p in self.snow_particles if p[1] < SCREEN_HEIGHT]
-        self.fog_particles = [p for p in self.fog_particles if 0 <= p[0] < SCREEN_WIDTH * 2]
-        
         # Spawn particles only if not fading out
-        if not self.is_fading_out:
-            if self.weather_type == "rain" and len(self.rain_particles) < self.max_particles["rain"]:
-                for _ in range(3):
-                    self.rain_particles.append([random.randint(0, SCREEN_WIDTH), 0, random.uniform(200, 300)])
-            elif self.weather_type == "snow" and len(self.snow_particles) < self.max_particles["snow"]:
-                for _ in range(2):
-                    self.snow_particles.append([random.randint(0, SCREEN_WIDTH), 0, random.uniform(50, 100)])
-            elif self.weather_type == "fog" and len(self.fog_particles) < self.max_particles["fog"]:
-                for _ in range(1):
-                    self.fog_particles.append([0, random.randint(0, SCREEN_HEIGHT), random.uniform(20, 50)])
+        for weather_type, particles in self.particles.items():
+            config = WEATHER_PARTICLES[weather_type]
+            if weather_type == self.weather_type and not self.is_fading_out:
+                self.spawn_budget[weather_type] += config["rate"] * WEATHER_DENSITY * dt
+                count = int(self.spawn_budget[weather_type])
+                self.spawn_budget[weather_type] -= count
+                particles.spawn(count, config["x"], config["y"], config["vx"], config["vy"], config["life"])
+            else:
+                self.spawn_budget[weather_type] = 0.0
+            particles.update(dt, config["bounds"], config["jitter"])
+
+    def is_active(self):
+        return self.weather_type != "clear" or self.weather_alpha > 0
+
+    def is_animating(self):
+        # Whether the drawn weather layer changes from frame to frame: moving particles or a fade
+        particles = self.particles.get(self.weather_type)
+        return particles is not None and (particles.get_count() > 0 or self.weather_alpha != self.target_alpha)
 
-        # Update particle positions
-        for particle in self.rain_particles:
-            particle[1] += particle[2] * dt
-        for particle in self.snow_particles:
-            particle[1] += particle[2] * dt
-            particle[0] += random.uniform(-10, 10) * dt
-        for particle in self.fog_particles:
-            particle[0] += particle[2] * dt
-                
     def draw(self, surface):
         self.weather_surface.fill((0, 0, 0, 0))
-        if self.weather_type == "rain":
-            self.weather_surface.fill((0, 0, 0, self.weather_alpha // 2))  # Max 50 alpha
-            for x, y, _ in self.rain_particles:
-                pygame.draw.line(self.weather_surface, (0, 150, 255, 50), (x, y), (x, y+5), 1)
-        elif self.weather_type == "snow":
-            self.weather_surface.fill((0, 0, 0, self.weather_alpha // 2))  # Max 50 alpha
-            for x, y, _ in self.snow_particles:
-                pygame.draw.circle(self.weather_surface, (255, 255, 255, 40), (int(x), int(y)), 2)
-        elif self.weather_type == "fog":
+        if self.weather_type in self.particles:
             self.weather_surface.fill((0, 0, 0, self.weather_alpha // 2))  # Max 50 alpha
-            for x, y, _ in self.fog_particles:
-                pygame.draw.rect(self.weather_surface, (150, 150, 150, 30), (x, y, 50, 20))
-        surface.blit(self.weather_surface, (0, 0))
\ No newline at end of file
+            self.particles[self.weather_type].draw(self.weather_surface)
+        surface.blit(self.weather_surface, (0, 0))
@@ -0,0 +1,128 @@
+# worldgen.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from settings import CHUNK_SIZE, MAP_TILES_X, MAP_TILES_Y
+
+# Mapa 100x100 com rio, montanhas, ruas e vilarejos
+def generate_tiles(seed, x, y):
+    # x and y are broadcastable arrays of tile coordinates; the output depends only on the inputs
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=np.int64), np.asarray(y, dtype=np.int64))
+    # Base de grama
+    tiles = np.zeros(x.shape, dtype=np.uint8)
+    # Rio diagonal (corta do canto superior esquerdo para inferior direito)
+    tiles[(np.abs(x - y) < 3) & (-1 < x) & (x < 100) & (-1 < y) & (y < 100)] = 2
+    # Montanhas (região nordeste e sudoeste)
+    tiles[(((x > 70) & (y < 30)) | ((x < 30) & (y > 70))) & ((x + y + seed) % 7 < 4)] = 1
+    # Caverna nas montanhas sudoeste (3x3 área)
+    tiles[(23 <= x) & (x <= 27) & (73 <= y) & (y <= 77)] = 5
+    # Caverna nas montanhas nordeste (3x3 área)
+    tiles[(73 <= x) & (x <= 77) & (23 <= y) & (y <= 27)] = 5
+    # Vilarejos (dois vilarejos com ruas)
+    # Vilarejo 1 (centro-esquerda) e suas ruas
+    village = (20 < x) & (x < 30) & (45 < y) & (y < 55)
+    tiles[village] = 3
+    tiles[village & ((x == 25) | (y == 50))] = 4
+    # Vilarejo 2 (centro-direita) e suas ruas
+    village = (60 < x) & (x < 70) & (45 < y) & (y < 55)
+    tiles[village] = 3
+    tiles[village & ((x == 65) | (y == 50))] = 4
+    # Estrada principal conectando vilarejos
+    tiles[((y == 50) & (30 <= x) & (x <= 60)) | ((x == 45) & (50 <= y) & (y <= 60))] = 4
+    return tiles
+
+def generate_region(seed, start_x, start_y, end_x, end_y, step=1):
+    xs = np.arange(start_x, end_x, step)
+    ys = np.arange(start_y, end_y, step)
+    return generate_tiles(seed, xs[np.newaxis, :], ys[:, np.newaxis])
+
+def get_chunk_bounds(chunk_x, chunk_y, chunk_size=CHUNK_SIZE, width=MAP_TILES_X, height=MAP_TILES_Y):
+    start_x = chunk_x * chunk_size
+    start_y = chunk_y * chunk_size
+    return start_x, start_y, min(start_x + chunk_size, width), min(start_y + chunk_size, height)
+
+def generate_chunk(seed, chunk_x, chunk_y, chunk_size=CHUNK_SIZE, width=MAP_TILES_X, height=MAP_TILES_Y):
+    return generate_region(seed, *get_chunk_bounds(chunk_x, chunk_y, chunk_size, width, height))
+
+def get_worker_count(workers):
+    if workers is None:
+        return max(1, (os.cpu_count() or 1) - 1)
+    return workers
+
+class ChunkGenerator:
+    # Generates chunks in worker processes; finished chunks are collected with poll()
+    def __init__(self, seed, workers=None, chunk_size=CHUNK_SIZE, width=MAP_TILES_X, height=MAP_TILES_Y):
+        self.seed = seed
+        self.workers = get_worker_count(workers)
+        self.chunk_size = chunk_size
+        self.width = width
+        self.height = height
+        self.executor = None  # Started on the first request
+        self.pending = {}  # chunk_key -> Future
+
+    def get_executor(self):
+        if self.executor is None and self.workers > 0:
+            try:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            except (NotImplementedError, OSError) as e:
+                print(f"Chunk generation falls back to the main thread: {e}")
+                self.workers = 0
+        return self.executor
+
+    def generate(self, chunk_key):
+        return generate_chunk(self.seed, chunk_key[0], chunk_key[1], self.chunk_size, self.width, self.height)
+
+    def request(self, chunk_key):
+        if chunk_key in self.pending:
+            return
+        executor = self.get_executor()
+        if executor is None:
+            self.pending[chunk_key] = None  # Generated on the main thread by the next poll()
+        else:
+            self.pending[chunk_key] = executor.submit(
+                generate_chunk, self.seed, chunk_key[0], chunk_key[1], self.chunk_size, self.width, self.height)
+
+    def is_pending(self, chunk_key):
+        return chunk_key in self.pending
+
+    def generate_now(self, chunk_key):
+        # Waits for an in-flight request instead of generating the chunk twice
+        future = self.pending.pop(chunk_key, None)
+        if future is not None:
+            return future.result()
+        return self.generate(chunk_key)
+
+    def poll(self):
+        finished = []
+        for chunk_key, future in list(self.pending.items()):
+            if future is None:
+                finished.append((chunk_key, self.generate(chunk_key)))
+            elif future.done():
+                finished.append((chunk_key, future.result()))
+            else:
+                continue
+            del self.pending[chunk_key]
+        return finished
+
+    def map(self, chunk_keys):
+        # Generates many chunks in order, spread across the workers
+        executor = self.get_executor()
+        if executor is None:
+            return (self.generate(chunk_key) for chunk_key in chunk_keys)
+        chunk_keys = list(chunk_keys)
+        return executor.map(
+            generate_chunk,
+            [self.seed] * len(chunk_keys),
+            [chunk_key[0] for chunk_key in chunk_keys],
+            [chunk_key[1] for chunk_key in chunk_keys],
+            [self.chunk_size] * len(chunk_keys),
+            [self.width] * len(chunk_keys),
+            [self.height] * len(chunk_keys),
+            chunksize=max(1, len(chunk_keys) // (self.workers * 4))
+        )
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.pending.clear()